@@ -0,0 +1,40 @@
+from cube import cube
+from pipeline import pipeline
+from postings import postings
+from sketch import sketch
+
+# Kostki i szkice, z których rysowane są wszystkie wykresy, z wymiarami, po których scala się ich komórki
+DIMENSIONS = {
+    'offers_cube': cube.CUBE_DIMENSIONS,
+    'history_cube': cube.HISTORY_DIMENSIONS,
+    'technology_cube': cube.TECHNOLOGY_DIMENSIONS,
+    'salary_sketches': sketch.SKETCH_KEYS,
+    'company_size_sketches': sketch.COMPANY_SIZE_KEYS,
+    'range_sketches': sketch.RANGE_KEYS,
+}
+
+
+def build_aggregates(offers):
+    # Z ofert z kolumną 'previous seen' (identity.mark_previous_seen) - całego zbioru albo jednej porcji pliku
+    return {
+        'offers_cube': cube.build_cube(offers),
+        'history_cube': cube.build_history_cube(offers),
+        'technology_cube': cube.build_technology_cube(offers, postings.build_postings(offers)),
+        'salary_sketches': sketch.build_sketches(offers),
+        'company_size_sketches': sketch.build_company_size_sketches(offers),
+        'range_sketches': sketch.build_range_sketches(offers),
+    }
+
+
+def merge_aggregates(parts):
+    return {name: cube.merge_cubes([part[name] for part in parts], dimensions)
+            for name, dimensions in DIMENSIONS.items()}
+
+
+def concat_aggregates(parts):
+    # Kolejne miesiące to nowe komórki (data raportu jest wymiarem) - doklejane bez przeliczania wcześniejszych
+    return {name: pipeline.concat_months([part[name].copy(deep=False) for part in parts]) for name in DIMENSIONS}
+
+
+def cells(aggregates):
+    return sum(len(frame) for frame in aggregates.values())
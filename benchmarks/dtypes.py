@@ -0,0 +1,89 @@
+import time
+
+import pandas as pd
+
+from cube import cube
+from identity import identity
+from pipeline import pipeline
+
+# Operacje, które nadal widzą wiersze: budowa kostek przy wczytaniu i typowe groupby/maski z wykresów
+# sprzed kostek. Same wykresy czytają już tylko kostki, więc układ kolumn ramki ich nie dotyczy
+OPERATIONS = {
+    'cube.build_cube': cube.build_cube,
+    'cube.build_history_cube': cube.build_history_cube,
+    "groupby(['report date', 'location']).size()":
+        lambda frame: frame.groupby(['report date', 'location'], observed=True).size(),
+    "groupby(['location', 'seniority']).size()":
+        lambda frame: frame.groupby(['location', 'seniority'], observed=True).size(),
+    "['technology'].value_counts()": lambda frame: frame['technology'].value_counts(),
+    "groupby('company size')['salary b2b mean'].median()":
+        lambda frame: frame.groupby('company size', observed=True)['salary b2b mean'].median(),
+    "['location'] != 'Remote'": lambda frame: frame['location'] != 'Remote',
+}
+
+
+def as_objects(all_offers):
+    # Układ sprzed zmiany: wymiary jako napisy (object), wynagrodzenia jako float64
+    converted = {}
+    for column, dtype in all_offers.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            converted[column] = all_offers[column].astype(object)
+        if column == 'company size':
+            # Dawny lambda w main.py zapisywał brak wielkości firmy jako None
+            converted[column] = converted[column].where(all_offers[column].notna(), None)
+        elif dtype == 'float32':
+            converted[column] = all_offers[column].astype('float64')
+    return all_offers.assign(**converted)
+
+
+def memory_report(before, after):
+    report = pd.DataFrame({
+        'przed [MB]': before.memory_usage(deep=True, index=False) / 1e6,
+        'po [MB]': after.memory_usage(deep=True, index=False) / 1e6,
+        'typ po': after.dtypes.astype(str),
+    })
+    report.loc['RAZEM'] = [report['przed [MB]'].sum(), report['po [MB]'].sum(), '']
+    return report.round(3)
+
+
+def best_time(function, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def time_operations(all_offers):
+    return pd.Series({name: best_time(operation, all_offers) for name, operation in OPERATIONS.items()})
+
+
+def time_prepare(scale):
+    # prepare_offers na surowych miesiącach wczytanych ze schematem (kategorie) i bez niego (object),
+    # jak w pierwotnym main.py
+    files = pipeline.find_dataset_files()
+    typed = pipeline.concat_months([pipeline.read_month(path, date) for date, path in files.items()] * scale)
+    untyped = pd.concat([pd.read_csv(path).assign(**{'report date': date}) for date, path in files.items()] * scale,
+                        ignore_index=True)
+    return best_time(pipeline.prepare_offers, untyped), best_time(pipeline.prepare_offers, typed)
+
+
+def main(scale=10):
+    after = pipeline.prepare_offers(pipeline.load_offers())
+    after = pipeline.concat_months([after.copy(deep=False) for _ in range(scale)])
+    after = identity.mark_previous_seen(after, identity.build_index(after['id hash'], after['report date']))
+    before = as_objects(after)
+
+    print(f"Pamięć ramki all_offers ({len(after)} wierszy):")
+    print(memory_report(before, after).to_string())
+
+    timings = pd.DataFrame({'object [ms]': time_operations(before), 'category [ms]': time_operations(after)})
+    timings.loc['pipeline.prepare_offers'] = time_prepare(scale)
+    timings['przyspieszenie'] = timings['object [ms]'] / timings['category [ms]']
+    print("\nCzas operacji na wierszach (najlepszy z 3):")
+    print(timings.round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+MODULES = ['main', 'export.export', 'offers.offers', 'salary.salary', 'seniority.seniority',
+           'technologies.technologies', 'contracts.contracts', 'churn.churn', 'histogram.histogram',
+           'cube.cube', 'pipeline.pipeline']
+PLOTTING = ['plotly.express', 'plotly.subplots']
+REPEATS = 9
+
+
+def import_times(module):
+    # -X importtime wypisuje na stderr czas każdego importu: "import time: własny | łączny | moduł" (w µs)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line or 'self [us]' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    print(f"{'moduł':<28} {'import':>10}  plotly.express / plotly.subplots")
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(REPEATS)]
+        # Minimum z powtórzeń - najmniej zależy od obciążenia maszyny
+        total = min(run[module] for run in runs) / 1000
+        plotting = ', '.join('tak' if name in runs[-1] else 'nie' for name in PLOTTING)
+        print(f"{module:<28} {total:8.1f} ms  {plotting}")
+
+
+if __name__ == "__main__":
+    main()
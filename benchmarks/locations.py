@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from locations import locations
+
+LEGACY_COLUMNS = ['population', 'lat', 'lon']
+REPEATS = 5
+
+
+def legacy_join(frame):
+    # Dawny sposób z offers.py: słowniki nazw i map(lambda) wiersz po wierszu, tylko dokładna pisownia
+    table, _ = locations.location_table()
+    population = dict(zip(table['name'], table['population']))
+    coordinates = dict(zip(table['name'], zip(table['lat'], table['lon'])))
+    frame = frame.copy()
+    frame['population'] = frame['location'].map(lambda x: population.get(x, 0))
+    frame['lat'] = frame['location'].map(lambda x: coordinates[x][0] if x in coordinates else None)
+    frame['lon'] = frame['location'].map(lambda x: coordinates[x][1] if x in coordinates else None)
+    return frame
+
+
+def locality_frame(rows, localities, seed=0):
+    # Nazwy z tabeli w kilku zapisach oraz miejscowości spoza niej - łącznie `localities` różnych wartości
+    table, _ = locations.location_table()
+    names = list(table['name'])
+    variants = names + [name.upper() for name in names] + [f" {name.lower()} " for name in names]
+    variants += [f"Miejscowość {i}" for i in range(max(localities - len(variants), 0))]
+    rng = np.random.default_rng(seed)
+    values = np.asarray(variants, dtype=object)[rng.integers(0, len(variants), size=rows)]
+    return pd.DataFrame({'location': pd.Categorical(values), 'count': rng.integers(1, 10, size=rows)})
+
+
+def measure(function, frame, repeat=1, **kwargs):
+    # Najlepszy z kilku przebiegów - pojedynczy pomiar na milionie wierszy zależy od alokacji pamięci
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(frame, **kwargs)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    for rows, localities in [(10_000, 100), (1_000_000, 100), (1_000_000, 5_000)]:
+        frame = locality_frame(rows, localities)
+        locations.normalize_location.cache_clear()
+        # Pierwsze wywołanie normalizuje wszystkie wartości, kolejne biorą je z cache
+        joined, first_time = measure(locations.join_locations, frame, columns=LEGACY_COLUMNS)
+        legacy, legacy_time = measure(legacy_join, frame, REPEATS)
+        # Te same kolumny co dawny kod; pełne złączenie dodaje jeszcze nazwę i województwo
+        _, join_time = measure(locations.join_locations, frame, REPEATS, columns=LEGACY_COLUMNS)
+        _, full_time = measure(locations.join_locations, frame, REPEATS)
+
+        print(f"{rows} wierszy, {localities} miejscowości")
+        print(f"  map(lambda):                 {legacy_time * 1000:7.1f} ms, "
+              f"rozpoznane {(legacy['population'] > 0).mean():.0%} wierszy")
+        print(f"  join_locations (pierwsze):   {first_time * 1000:7.1f} ms, "
+              f"rozpoznane {(joined['population'] > 0).mean():.0%} wierszy")
+        print(f"  join_locations:              {join_time * 1000:7.1f} ms")
+        print(f"  join_locations (5 kolumn):   {full_time * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import main
+
+PAGES = {
+    '/offers': ['offers-all', 'offers-latest', 'offers-all-per-1000', 'offers-latest-per-1000', 'offers-cities'],
+    '/salaries': ['salary-seniority', 'salary-percentiles', 'salary-contract-type', 'salary-company-size-b2b',
+                  'salary-company-size-uop', 'salary-technology', 'salary-city'],
+    '/seniority': ['seniority-distribution', 'seniority-city', 'seniority-technology', 'seniority-trends'],
+    '/tech_stack': ['technology-distribution', 'technology-treemap-all', 'technology-treemap-latest',
+                    'technology-trends'],
+    '/contracts': ['contracts-city', 'contracts-remote'],
+    '/churn': ['churn-monthly', 'churn-lifetimes'],
+}
+
+NO_FILTERS = [
+    {"id": "filter-months", "property": "value", "value": None},
+    {"id": "filter-locations", "property": "value", "value": None},
+    {"id": "filter-technologies", "property": "value", "value": None},
+    {"id": "filter-seniorities", "property": "value", "value": None},
+]
+
+
+def request_page(client, pathname):
+    response = client.post('/_dash-update-component', json={
+        "output": "page-content.children",
+        "outputs": {"id": "page-content", "property": "children"},
+        "inputs": [{"id": "url", "property": "pathname", "value": pathname}],
+        "changedPropIds": ["url.pathname"],
+    })
+    assert response.status_code == 200
+    return response
+
+
+def request_chart(client, name):
+    chart_id = {"type": "chart", "name": name}
+    response = client.post('/_dash-update-component', json={
+        "output": '{"name":["MATCH"],"type":"chart"}.figure',
+        "outputs": {"id": chart_id, "property": "figure"},
+        "inputs": [{"id": chart_id, "property": "id", "value": chart_id}] + NO_FILTERS,
+        "changedPropIds": [],
+    })
+    assert response.status_code == 200
+    return response
+
+
+def synchronous_page(names):
+    # Dawne zachowanie: strona wraca dopiero po zbudowaniu wszystkich wykresów
+    start = time.perf_counter()
+    view = main.current_view(None, None, None, None)
+    for name in names:
+        main.CHARTS[name](view)
+    return time.perf_counter() - start
+
+
+def progressive_page(client, pathname, names):
+    # Przeglądarka wysyła żądania wykresów równolegle, zaraz po otrzymaniu szkieletu strony
+    start = time.perf_counter()
+    request_page(client, pathname)
+    skeleton = time.perf_counter() - start
+
+    finished = []
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        futures = {executor.submit(request_chart, client, name): name for name in names}
+        for future in as_completed(futures):
+            future.result()
+            finished.append((time.perf_counter() - start, futures[future]))
+    return skeleton, finished
+
+
+def main_benchmark():
+    # Pełne rozgrzanie (jak przed /ready 200) - inaczej strony zwracają komunikat o rozgrzewaniu zamiast szkieletu
+    main.warm_up()
+    client = main.app.server.test_client()
+    # Pierwsze wywołanie plotly inicjalizuje szablony - nie liczymy go do żadnej ze stron
+    synchronous_page(PAGES['/contracts'])
+    for pathname, names in PAGES.items():
+        main.figure_cache.invalidate()
+        synchronous = synchronous_page(names)
+
+        main.figure_cache.invalidate()
+        skeleton, finished = progressive_page(client, pathname, names)
+        first_time, first_name = finished[0]
+        full_time = finished[-1][0]
+
+        print(f"{pathname}")
+        print(f"  cała strona naraz:          {synchronous * 1000:7.0f} ms")
+        print(f"  szkielet strony:            {skeleton * 1000:7.0f} ms")
+        print(f"  pierwszy wykres:            {first_time * 1000:7.0f} ms ({first_name})")
+        print(f"  wszystkie wykresy:          {full_time * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main_benchmark()
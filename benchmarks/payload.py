@@ -0,0 +1,87 @@
+import gzip
+import json
+import re
+import time
+
+from dash._utils import to_json
+
+import main
+from benchmarks import page_load
+from payload import payload
+
+
+def callback_response(figure):
+    # Ten sam kształt odpowiedzi, który Dash serializuje dla callbacku wykresu
+    return {'multi': True, 'response': {'chart': {'figure': figure}}}
+
+
+def legacy_payload(fig):
+    # Dotychczasowa ścieżka: to_json przy budowie, json.loads i serializacja Dash przy każdej odpowiedzi
+    start = time.perf_counter()
+    figure_json = fig.to_json()
+    encoded = time.perf_counter()
+    body = to_json(callback_response(json.loads(figure_json)))
+    return body.encode(), encoded - start, time.perf_counter() - encoded
+
+
+def current_payload(fig):
+    start = time.perf_counter()
+    figure_json = payload.figure_json(fig)
+    encoded = time.perf_counter()
+    body = to_json(callback_response(payload.loads(figure_json)))
+    return body.encode(), encoded - start, time.perf_counter() - encoded
+
+
+def measure_page(names, view, serialize, repeat=5):
+    totals = {'build': 0.0, 'serve': 0.0, 'bytes': 0, 'gzip': 0, 'br': 0}
+    for name in names:
+        fig = main.CHARTS[name](view)
+        best_build, best_serve = float('inf'), float('inf')
+        for _ in range(repeat):
+            body, build, serve = serialize(fig)
+            best_build, best_serve = min(best_build, build), min(best_serve, serve)
+        totals['build'] += best_build
+        totals['serve'] += best_serve
+        totals['bytes'] += len(body)
+        totals['gzip'] += len(gzip.compress(body, compresslevel=payload.GZIP_LEVEL))
+        if payload.brotli is not None:
+            totals['br'] += len(payload.compress(body, 'br'))
+    return totals
+
+
+def first_visit(client, accept_encoding):
+    # Strona startowa i wszystkie skrypty Dash (m.in. plotly.min.js), które przeglądarka pobiera przy pierwszym wejściu
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    start = time.perf_counter()
+    index = client.get('/', headers=headers)
+    html = gzip.decompress(index.data) if index.headers.get('Content-Encoding') == 'gzip' else index.data
+    total = len(index.data)
+    for src in re.findall(r'<script src="([^"]+)"', html.decode()):
+        total += len(client.get(src, headers=headers).data)
+    return total, time.perf_counter() - start
+
+
+def main_benchmark():
+    # Rozgrzanie przed pierwszym żądaniem - inaczej klient testowy uruchomiłby je w tle w trakcie pomiarów
+    main.warm_up()
+    # Wykresy bez cache - mierzymy serializację obiektów Figure, a nie trafienia w cache
+    main.cached = lambda function, *args, **kwargs: function(*args, **kwargs)
+    view = main.current_view(None, None, None, None)
+    print(f"orjson: {'tak' if payload.orjson is not None else 'nie'}, "
+          f"brotli: {'tak' if payload.brotli is not None else 'nie'}")
+    client = main.app.server.test_client()
+    for label, accept_encoding in [('bez kompresji', None), ('gzip', 'gzip'), ('gzip, ponownie', 'gzip')]:
+        total, seconds = first_visit(client, accept_encoding)
+        print(f"Pierwsze wejście ({label}): {total / 1e6:5.2f} MB, {seconds * 1000:6.0f} ms po stronie serwera")
+
+    for pathname, names in page_load.PAGES.items():
+        print(pathname)
+        for label, serialize in [('przed', legacy_payload), ('po', current_payload)]:
+            totals = measure_page(names, view, serialize)
+            brotli = f", br {totals['br'] / 1e3:7.1f} kB" if payload.brotli is not None else ''
+            print(f"  {label:<6} JSON {totals['bytes'] / 1e3:8.1f} kB, gzip {totals['gzip'] / 1e3:7.1f} kB{brotli}; "
+                  f"zapis przy budowie {totals['build'] * 1000:6.1f} ms, odpowiedź z cache {totals['serve'] * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import dtypes
+from pipeline import pipeline
+
+
+def legacy_prepare_offers(all_offers):
+    # Pierwotny blok z main.py (apply/transform wiersz po wierszu) - punkt odniesienia
+    all_offers = all_offers.copy()
+    all_offers['salary employment mean'] = round(
+        all_offers['salary employment min'] * 0.5 + all_offers['salary employment max'] * 0.5)
+    all_offers['salary b2b mean'] = round(all_offers['salary b2b min'] * 0.5 + all_offers['salary b2b max'] * 0.5)
+    all_offers['contract type'] = all_offers.apply(lambda x: 'both' if (
+            (np.isnan(x['salary employment mean']) == False) & (np.isnan(x['salary b2b mean']) == False)) else False,
+                                                   axis=1)
+    all_offers['contract type'] = all_offers.apply(
+        lambda x: 'b2b' if ((x['contract type'] == False) & (np.isnan(x['salary employment mean']) == True)) else x[
+            'contract type'], axis=1)
+    all_offers['contract type'] = all_offers.apply(
+        lambda x: 'employment' if ((x['contract type'] == False) & (np.isnan(x['salary b2b mean']) == True)) else x[
+            'contract type'], axis=1)
+    all_offers['contract type'] = all_offers.apply(
+        lambda x: 'none' if (x['contract type'] == False) else x['contract type'], axis=1)
+    all_offers['company size'] = all_offers['company size'].transform(lambda x: None if np.isnan(x) else min(10000, x))
+    all_offers['company size'] = all_offers['company size'].transform(
+        lambda x: None if np.isnan(x) else str(round(x)) + "+")
+    all_offers['is remote'] = all_offers['location'].transform(lambda x: 'Non Remote' if x != 'Remote' else x)
+    return all_offers
+
+
+def load_raw_offers(dataset_dir='dataset'):
+    # Wczytanie bez schematu, tak jak w pierwotnym main.py
+    dfs = []
+    for report_date, path in pipeline.find_dataset_files(dataset_dir).items():
+        df = pd.read_csv(path)
+        df['report date'] = report_date
+        dfs.append(df)
+    return pd.concat(dfs)
+
+
+def scale_offers(raw, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return raw.iloc[rng.integers(0, len(raw), size=rows)].reset_index(drop=True)
+
+
+def measure(function, frame):
+    start = time.perf_counter()
+    result = function(frame)
+    return result, time.perf_counter() - start
+
+
+def main(rows=1_000_000):
+    raw = load_raw_offers()
+    frame = scale_offers(raw, rows)
+
+    vectorized, vectorized_time = measure(pipeline.prepare_offers, frame)
+    legacy, legacy_time = measure(legacy_prepare_offers, frame)
+
+    # prepare_offers zwraca kolumny kategoryczne - porównujemy wartości w dawnym układzie typów;
+    # skrótu id ani listy technologii pierwotna wersja nie liczyła
+    pd.testing.assert_frame_equal(dtypes.as_objects(vectorized.drop(columns=['id hash', 'technologies'])), legacy,
+                                  check_dtype=False)
+
+    print(f"Liczba wierszy: {rows}")
+    print(f"apply/transform: {legacy_time:.2f} s")
+    print(f"prepare_offers:  {vectorized_time:.2f} s")
+    print(f"Przyspieszenie:  {legacy_time / vectorized_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DURATION = 10
+CLIENTS = 8
+
+CHART_REQUEST = json.dumps({
+    "output": '{"name":["MATCH"],"type":"chart"}.figure',
+    "outputs": {"id": {"type": "chart", "name": "offers-all"}, "property": "figure"},
+    "inputs": [
+        {"id": {"type": "chart", "name": "offers-all"}, "property": "id",
+         "value": {"type": "chart", "name": "offers-all"}},
+        {"id": "filter-months", "property": "value", "value": None},
+        {"id": "filter-locations", "property": "value", "value": None},
+        {"id": "filter-technologies", "property": "value", "value": None},
+        {"id": "filter-seniorities", "property": "value", "value": None},
+    ],
+    "changedPropIds": [],
+}).encode()
+
+SERVERS = {
+    'dev server (app.run(debug=True))': ([sys.executable, 'main.py'], 'http://127.0.0.1:8050'),
+    'gunicorn (gunicorn.conf.py)': (['gunicorn', '-c', 'gunicorn.conf.py', '-b', '127.0.0.1:8051'],
+                                    'http://127.0.0.1:8051'),
+}
+
+
+def fetch(url, data=None):
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def wait_until_ready(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            # /ready odpowiada 503 (HTTPError, czyli też OSError), dopóki worker nie wczyta danych i wykresów
+            fetch(url + '/ready')
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"Serwer {url} nie odpowiada")
+
+
+def requests_per_second(url, data=None):
+    def client():
+        done = 0
+        deadline = time.monotonic() + DURATION
+        while time.monotonic() < deadline:
+            fetch(url, data)
+            done += 1
+        return done
+
+    with ThreadPoolExecutor(max_workers=CLIENTS) as executor:
+        return sum(executor.map(lambda _: client(), range(CLIENTS))) / DURATION
+
+
+def memory_kb(pid, field):
+    with open(f'/proc/{pid}/smaps_rollup') as smaps:
+        for line in smaps:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+
+def process_tree(pid):
+    children = subprocess.run(['pgrep', '-P', str(pid)], capture_output=True, text=True).stdout.split()
+    return [pid] + [int(child) for child in children]
+
+
+def main():
+    for name, (command, url) in SERVERS.items():
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+        try:
+            wait_until_ready(url)
+            # Pierwsze żądanie buduje wykres, kolejne mierzą już samą obsługę żądań
+            fetch(url + '/_dash-update-component', CHART_REQUEST)
+            layout = requests_per_second(url + '/_dash-layout')
+            chart = requests_per_second(url + '/_dash-update-component', CHART_REQUEST)
+
+            pids = process_tree(process.pid)
+            rss = sum(memory_kb(pid, 'Rss') for pid in pids)
+            pss = sum(memory_kb(pid, 'Pss') for pid in pids)
+            print(name)
+            print(f"  /_dash-layout:          {layout:7.1f} req/s")
+            print(f"  wykres z cache:         {chart:7.1f} req/s")
+            print(f"  pamięć procesów: RSS {rss / 1024:.0f} MB, PSS {pss / 1024:.0f} MB ({len(pids)} procesów)")
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
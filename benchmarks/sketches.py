@@ -0,0 +1,62 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from filters import filters
+from histogram import histogram
+from pipeline import pipeline
+from sketch import sketch
+from snapshot import snapshot
+
+KEYS = ['salary', 'seniority', 'report date']
+LEVELS = [0.1, 0.5, 0.9]
+SELECTIONS = [
+    filters.normalize_selection(),
+    filters.normalize_selection(locations=['Warszawa']),
+    filters.normalize_selection(technologies=['Python', 'Java'], locations=['Kraków', 'Wrocław']),
+]
+
+
+def exact_quantiles(all_offers, selection):
+    # Dotychczasowy sposób: sortowanie wynagrodzeń wybranych ofert (histogram.grouped_quantiles)
+    offers = filters.filter_cube(all_offers, selection)
+    parts = {}
+    for salary, column in sketch.SKETCH_SALARIES.items():
+        part = offers[['seniority', 'report date', column]].dropna(subset=['seniority', column])
+        grouped = part.groupby(['seniority', 'report date'], observed=True)[column]
+        values = histogram.grouped_quantiles(grouped.ngroup().to_numpy(), part[column].to_numpy(dtype='float64'),
+                                             np.ones(len(part)), grouped.ngroups, LEVELS)
+        parts[salary] = pd.DataFrame(values, index=grouped.size().index, columns=LEVELS)
+    return pd.concat(parts, names=['salary'])
+
+
+def sketch_quantiles(salary_sketches, selection):
+    sketches = filters.filter_cube(salary_sketches, selection)
+    sketches = sketches[sketches['salary'].isin(list(sketch.SKETCH_SALARIES))]
+    return sketch.quantiles(sketches, KEYS, LEVELS)[LEVELS]
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(scale=100):
+    all_offers, _ = snapshot.load_prepared_offers()
+    all_offers = pipeline.concat_months([all_offers.copy(deep=False) for _ in range(scale)])
+    salary_sketches, build_time = measure(sketch.build_sketches, all_offers)
+    print(f"{len(all_offers)} ofert -> {len(salary_sketches)} kubełków w szkicach ({build_time:.2f} s)")
+
+    for selection in SELECTIONS:
+        exact, exact_time = measure(exact_quantiles, all_offers, selection)
+        approximate, sketch_time = measure(sketch_quantiles, salary_sketches, selection)
+        exact = exact.reindex(approximate.index)
+        error = ((approximate - exact).abs() / exact).max().max()
+        print(f"  {selection[2:]}: dokładnie {exact_time * 1000:7.1f} ms, szkice {sketch_time * 1000:6.1f} ms, "
+              f"największy błąd P10/P50/P90 {error:.2%} (gwarantowany {sketch.RELATIVE_ACCURACY:.0%})")
+
+
+if __name__ == "__main__":
+    main()
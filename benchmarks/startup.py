@@ -0,0 +1,28 @@
+import tempfile
+import time
+
+import pandas as pd
+
+from snapshot import snapshot
+
+
+def measure(cache_dir):
+    start = time.perf_counter()
+    all_offers, latest = snapshot.load_prepared_offers(cache_dir=cache_dir)
+    return all_offers, time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold, cold_time = measure(cache_dir)
+        warm, warm_time = measure(cache_dir)
+
+    pd.testing.assert_frame_equal(cold, warm)
+
+    print(f"Format snapshotu: {snapshot.SNAPSHOT_FORMAT}")
+    print(f"Zimny start (CSV + prepare_offers + zapis): {cold_time * 1000:.0f} ms")
+    print(f"Ciepły start (snapshot):                    {warm_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
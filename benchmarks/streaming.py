@@ -0,0 +1,79 @@
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import suite
+from synthetic import synthetic
+
+MONTHS = 6
+ROWS_PER_MONTH = 1_000_000
+CHUNK_SIZES = [25_000, 100_000, 400_000]
+
+
+def measure(mode, dataset_dir, chunksize):
+    # Uruchamiane w osobnym procesie, żeby ru_maxrss dotyczył tylko jednego sposobu wczytania
+    from aggregates import aggregates
+    from identity import identity
+    from pipeline import pipeline
+    from stream import stream
+
+    start = time.perf_counter()
+    if mode == 'stream':
+        offer_aggregates, _ = stream.aggregate_offers(dataset_dir, chunksize)
+        rows = 0
+    else:
+        all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+        offer_index = identity.build_index(all_offers['id hash'], all_offers['report date'])
+        offer_aggregates = aggregates.build_aggregates(identity.mark_previous_seen(all_offers, offer_index))
+        rows = len(all_offers)
+    print(json.dumps({
+        'seconds': time.perf_counter() - start,
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rows': rows,
+        'cells': aggregates.cells(offer_aggregates),
+        'offers': int(offer_aggregates['offers_cube']['count'].sum()),
+        'sketched': int(offer_aggregates['salary_sketches']['count'].sum()),
+    }))
+
+
+def run(mode, dataset_dir, chunksize=0):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.streaming', mode, dataset_dir, str(chunksize)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def compare(dataset_dir):
+    baseline = run('memory', dataset_dir)
+    print(f"  cała historia w pamięci:      {baseline['seconds']:6.1f} s, szczyt {baseline['peak_mb']:6.0f} MB, "
+          f"{baseline['rows']} wierszy, {baseline['cells']} komórek")
+    for chunksize in CHUNK_SIZES:
+        result = run('stream', dataset_dir, chunksize)
+        # Te same kostki i szkice niezależnie od sposobu wczytania
+        assert (result['offers'], result['sketched'], result['cells']) == \
+            (baseline['offers'], baseline['sketched'], baseline['cells'])
+        print(f"  strumieniowo, porcja {chunksize:>7}: {result['seconds']:6.1f} s, szczyt {result['peak_mb']:6.0f} MB, "
+              f"{result['cells']} komórek")
+
+
+def main():
+    # Zbiór z repozytorium powielony 300 razy: wartości się powtarzają, jak w prawdziwych ogłoszeniach
+    with tempfile.TemporaryDirectory() as dataset_dir:
+        suite.write_scaled_dataset('dataset', dataset_dir, 300)
+        print("dataset/ x 300")
+        compare(dataset_dir)
+
+    # Dane syntetyczne: każdy wiersz ma losowo przeskalowane widełki, więc prawie się nie powtarzają
+    with tempfile.TemporaryDirectory() as dataset_dir:
+        synthetic.generate_dataset(dataset_dir, MONTHS, ROWS_PER_MONTH)
+        print(f"synthetic, {MONTHS} miesięcy x {ROWS_PER_MONTH} ofert")
+        compare(dataset_dir)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        measure(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,219 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from glob import glob
+
+from churn import churn
+from contracts import contracts
+from cube import cube
+from identity import identity
+from offers import offers
+from pipeline import pipeline
+from postings import postings
+from salary import salary
+from seniority import seniority
+from sketch import sketch
+from technologies import technologies
+
+SCALES = [1, 10, 100]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+CHART_MODULES = [offers, salary, seniority, technologies, contracts, churn]
+# Wolniejszy o więcej niż 10% - oznaczany w porównaniu jako regresja
+REGRESSION_THRESHOLD = 1.1
+
+
+def show_functions():
+    # Wszystkie publiczne show_* - nowy wykres trafia do pomiarów bez edytowania listy
+    for module in CHART_MODULES:
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('show_') and function.__module__ == module.__name__:
+                yield f"{module.__name__.rsplit('.', 1)[-1]}.{name}", function
+
+
+def required_arguments(function):
+    return [name for name, parameter in inspect.signature(function).parameters.items()
+            if parameter.default is inspect.Parameter.empty]
+
+
+def write_scaled_dataset(dataset_dir, target_dir, scale):
+    # Każdy plik miesięczny powielony scale razy - ten sam rozkład wartości, scale razy więcej wierszy
+    for path in pipeline.find_dataset_files(dataset_dir).values():
+        with open(path, encoding='utf-8') as source:
+            header = source.readline()
+            body = source.read()
+        if not body.endswith('\n'):
+            body += '\n'
+        with open(os.path.join(target_dir, os.path.basename(path)), 'w', encoding='utf-8') as target:
+            target.write(header)
+            for _ in range(scale):
+                target.write(body)
+
+
+def measure(function, args, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+
+    # Szczyt pamięci w osobnym przebiegu - tracemalloc spowalnia kod i zafałszowałby czas
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run_scale(scale, repeat, only=None, dataset_dir='dataset'):
+    results = []
+
+    def record(case, function, args, rows, figure=False):
+        if only and only not in case:
+            return function(*args)
+        result, seconds, peak = measure(function, args, repeat)
+        figure_size = len(result.to_json()) if figure else None
+        results.append({
+            'case': case,
+            'scale': scale,
+            'rows': rows,
+            'time_ms': round(seconds * 1000, 3),
+            'peak_mb': round(peak / 1e6, 3),
+            'figure_kb': None if figure_size is None else round(figure_size / 1e3, 1),
+        })
+        size = '' if figure_size is None else f"{figure_size / 1e3:9.1f} kB"
+        print(f"  {case:<58} {seconds * 1000:9.1f} ms {peak / 1e6:8.1f} MB {size}", flush=True)
+        return result
+
+    with tempfile.TemporaryDirectory() as scaled_dir:
+        write_scaled_dataset(dataset_dir, scaled_dir, scale)
+        raw = record('pipeline.load_offers', pipeline.load_offers, [scaled_dir], None)
+
+    rows = len(raw)
+    all_offers = record('pipeline.prepare_offers', pipeline.prepare_offers, [raw], rows)
+    del raw
+    offer_index = record('identity.build_index', identity.build_index,
+                         [all_offers['id hash'], all_offers['report date']], rows)
+    all_offers = record('identity.mark_previous_seen', identity.mark_previous_seen, [all_offers, offer_index], rows)
+    offers_cube = record('cube.build_cube', cube.build_cube, [all_offers], rows)
+    history_cube = record('cube.build_history_cube', cube.build_history_cube, [all_offers], rows)
+    technology_cube = record('cube.build_technology_cube', cube.build_technology_cube,
+                             [all_offers, postings.build_postings(all_offers)], rows)
+    salary_sketches = record('sketch.build_sketches', sketch.build_sketches, [all_offers], rows)
+    company_size_sketches = record('sketch.build_company_size_sketches', sketch.build_company_size_sketches,
+                                   [all_offers], rows)
+    range_sketches = record('sketch.build_range_sketches', sketch.build_range_sketches, [all_offers], rows)
+
+    colors = dict(zip(all_offers['location'].unique(), ['#1f77b4'] * 1000))
+    arguments = {
+        'offers_cube': offers_cube,
+        'latest_cube': cube.latest_cube(offers_cube),
+        'history_cube': history_cube,
+        'latest_history_cube': cube.latest_cube(history_cube),
+        'technology_cube': technology_cube,
+        'latest_technology_cube': cube.latest_cube(technology_cube),
+        'salary_sketches': salary_sketches,
+        'company_size_sketches': company_size_sketches,
+        'range_sketches': range_sketches,
+        'location_colors': colors,
+        'technology_colors': colors,
+        'offer_churn': identity.churn(offer_index),
+        'offer_lifetimes': identity.lifetimes(offer_index),
+    }
+    for case, function in show_functions():
+        record(case, function, [arguments[name] for name in required_arguments(function)], rows, figure=True)
+    return results
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{revision}-dirty" if dirty else revision
+
+
+def run(scales=SCALES, repeat=3, only=None, output=None):
+    revision = git_revision()
+    results = []
+    for scale in scales:
+        print(f"Skala {scale}x:")
+        results.extend(run_scale(scale, repeat, only))
+
+    report = {
+        'revision': revision,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPU",
+        'repeat': repeat,
+        'results': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = output or os.path.join(RESULTS_DIR, f"{revision}.json")
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=1)
+    print(f"Zapisano wyniki: {output}")
+    return output
+
+
+def load_results(name):
+    path = name if os.path.exists(name) else os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path, encoding='utf-8') as file:
+        report = json.load(file)
+    return report['revision'], {(result['case'], result['scale']): result for result in report['results']}
+
+
+def compare(base, head):
+    base_revision, base_results = load_results(base)
+    head_revision, head_results = load_results(head)
+    print(f"{'przypadek':<58} {'skala':>5} {base_revision:>12} {head_revision:>12} {'zmiana':>8}")
+    regressions = 0
+    for key in sorted(base_results.keys() & head_results.keys(), key=lambda key: (key[1], key[0])):
+        before, after = base_results[key]['time_ms'], head_results[key]['time_ms']
+        ratio = after / before if before else float('inf')
+        flag = ' <- wolniej' if ratio > REGRESSION_THRESHOLD else ''
+        regressions += bool(flag)
+        print(f"{key[0]:<58} {key[1]:>4}x {before:10.1f}ms {after:10.1f}ms {ratio:7.2f}x{flag}")
+    return regressions
+
+
+def stored_results():
+    return sorted(os.path.basename(path)[:-len('.json')] for path in glob(os.path.join(RESULTS_DIR, '*.json')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pomiary wczytywania danych i budowy wykresów")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="uruchom pomiary i zapisz wyniki w benchmarks/results")
+    run_parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--only', help="tylko przypadki zawierające ten tekst")
+    run_parser.add_argument('--output')
+
+    compare_parser = commands.add_parser('compare', help="porównaj dwa zapisane przebiegi (rewizja lub ścieżka)")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+
+    commands.add_parser('list', help="pokaż zapisane przebiegi")
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args.scales, args.repeat, args.only, args.output)
+    elif args.command == 'compare':
+        raise SystemExit(1 if compare(args.base, args.head) else 0)
+    else:
+        print('\n'.join(stored_results()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from metrics import metrics
+from payload import payload
+
+metrics.histogram('dashboard_figure_seconds', "Czas budowy wykresu show_* razem z to_json (tylko przy braku w cache)")
+metrics.histogram('dashboard_figure_bytes', "Rozmiar wykresu zapisanego jako JSON", metrics.SIZE_BUCKETS)
+
+
+class FigureCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, function, args, kwargs):
+        params = tuple(param_key(arg) for arg in args) + tuple(
+            (name, param_key(value)) for name, value in sorted(kwargs.items()))
+        return function.__module__, function.__qualname__, self.version, params
+
+    def get(self, function, *args, **kwargs):
+        key = self.key(function, args, kwargs)
+        with self._lock:
+            figure_json = self._figures.get(key)
+            if figure_json is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+        if figure_json is None:
+            # Budowa wykresu poza blokadą - inne strony mogą w tym czasie korzystać z cache
+            start = time.perf_counter()
+            figure_json = payload.figure_json(function(*args, **kwargs))
+            name = f"{function.__module__.rsplit('.', 1)[-1]}.{function.__qualname__}"
+            metrics.observe('dashboard_figure_seconds', time.perf_counter() - start, function=name)
+            metrics.observe('dashboard_figure_bytes', len(figure_json), function=name)
+            with self._lock:
+                self.misses += 1
+                if key[2] == self.version:
+                    self._figures[key] = figure_json
+                    while len(self._figures) > self.maxsize:
+                        self._figures.popitem(last=False)
+                        self.evictions += 1
+        # Każde wywołanie dostaje własny słownik, więc nikt nie zmodyfikuje wersji z cache
+        return payload.loads(figure_json)
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._figures.clear()
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self._figures),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0,
+            }
+
+
+def param_key(value):
+    # Ramki danych zmieniają się tylko razem z wersją zbioru, więc wystarczy ich tożsamość;
+    # ramki tymczasowe (np. po filtrowaniu) niosą własny klucz w attrs, bo ich id może zostać użyte ponownie
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return type(value).__name__, value.attrs.get('cache_key', id(value))
+    if isinstance(value, dict):
+        return tuple(sorted((str(name), param_key(item)) for name, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(param_key(item) for item in value)
+    return value
@@ -0,0 +1,55 @@
+churn_colors = {
+    'new': '#2ca02c',
+    'carried over': '#1f77b4',
+    'returning': '#9467bd',
+    'removed': '#d62728',
+}
+
+churn_labels = {
+    'new': 'Nowe',
+    'carried over': 'Z poprzedniego miesiąca',
+    'returning': 'Powracające',
+    'removed': 'Usunięte',
+}
+
+
+def show_offer_churn(offer_churn):
+    import plotly.graph_objects as go
+
+    # Oferty obecne w miesiącu rozbite wg pochodzenia; usunięte jako słupek poniżej zera
+    fig = go.Figure()
+    for column in ['carried over', 'returning', 'new', 'removed']:
+        values = -offer_churn[column] if column == 'removed' else offer_churn[column]
+        fig.add_bar(x=offer_churn['report date'], y=values, name=churn_labels[column],
+                    marker_color=churn_colors[column], customdata=offer_churn[column],
+                    hovertemplate="%{customdata}<extra>" + churn_labels[column] + "</extra>")
+
+    fig.update_layout(
+        barmode='relative',
+        title='Napływ i odpływ ofert z miesiąca na miesiąc',
+        xaxis_title='Data raportu',
+        yaxis_title='Liczba ofert',
+        width=1200,
+        height=600,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    fig.update_xaxes(dtick="M1", tickformat="%m.%Y")
+
+    # fig.write_html("churn/offer_churn.html")
+    return fig
+
+
+def show_offer_lifetimes(offer_lifetimes, period=''):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(x=offer_lifetimes.index, y=offer_lifetimes.to_numpy(), marker_color='#4e79a7'))
+    fig.update_layout(
+        title=f"Przez ile miesięcy oferta była widoczna w zestawieniu {period}".rstrip(),
+        xaxis_title='Liczba miesięcy',
+        yaxis_title='Liczba unikalnych ofert',
+        width=800,
+    )
+    fig.update_xaxes(dtick=1)
+
+    # fig.write_html("churn/offer_lifetimes.html")
+    return fig
@@ -1,11 +1,14 @@
-import plotly.express as px
+from cube import cube
+from pipeline import pipeline
 
 
-def show_contract_types_by_city(all_offers):
-    contract_dist = all_offers[all_offers['location'] != 'Remote'].groupby(
-        ['location', 'contract type']).size().unstack().fillna(0)
+def show_contract_types_by_city(offers_cube):
+    import plotly.express as px
+
+    contract_dist = cube.rollup(offers_cube[offers_cube['location'] != 'Remote'],
+                                ['location', 'contract type']).unstack().fillna(0)
     contract_dist = contract_dist.div(contract_dist.sum(axis=1), axis=0) * 100
-    contract_dist = contract_dist.reset_index().rename(columns={'location': 'Miasto'})
+    contract_dist = pipeline.decategorize(contract_dist.reset_index()).rename(columns={'location': 'Miasto'})
 
     contract_type_mapping = {
         'b2b': 'Tylko B2B',
@@ -22,7 +25,7 @@ def show_contract_types_by_city(all_offers):
         x='Procent ofert',
         color='Typ kontraktu',
         orientation='h',
-        title='Proporcje typów kontraktów na tle miast',
+        title=pipeline.titled('Proporcje typów kontraktów na tle miast', offers_cube['report date']),
         color_discrete_sequence=['#1E8449', '#77B43F', '#5D6D7E'],
         width=800,
         height=400,
@@ -40,10 +43,12 @@ def show_contract_types_by_city(all_offers):
     return fig
 
 
-def show_remote_contract_types(all_offers):
-    remote_jobs = all_offers[all_offers['location'] == 'Remote']
+def show_remote_contract_types(offers_cube):
+    import plotly.express as px
+
+    remote_jobs = offers_cube[offers_cube['location'] == 'Remote']
 
-    contract_counts = remote_jobs['contract type'].value_counts()
+    contract_counts = cube.counts(remote_jobs, 'contract type')
 
     label_map = {
         'b2b': 'Tylko B2B',
@@ -59,7 +64,7 @@ def show_remote_contract_types(all_offers):
         contract_df,
         names='contract type',
         values='count',
-        title='Rozkład typów kontraktów dla pracy zdalnej',
+        title=pipeline.titled('Rozkład typów kontraktów dla pracy zdalnej', offers_cube['report date']),
         color='contract type',
         color_discrete_sequence=['#1E8449', '#77B43F', '#5D6D7E'],
         width=400,
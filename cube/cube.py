@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from pipeline import pipeline
+from postings import postings
+
+# 'technology' to pierwsza technologia z ogłoszenia - liczba komórek zależy od liczby różnych wartości
+# wymiarów, a nie od kombinacji list technologii
+CUBE_DIMENSIONS = ['report date', 'location', 'technology', 'seniority', 'contract type']
+# Kostka technologii: wiersz na każdą wymienioną technologię i pełna lista z ogłoszenia ('technologies') -
+# po niej filtr technologii wybiera oferty wymieniające daną technologię na dowolnej pozycji
+TECHNOLOGY_DIMENSIONS = CUBE_DIMENSIONS + ['technologies']
+# Osobna kostka samych liczności z miesiącem poprzedniego wystąpienia oferty (identity.mark_previous_seen) -
+# pozwala liczyć unikalne oferty w dowolnym zakresie dat
+HISTORY_DIMENSIONS = ['report date', 'location', 'technologies', 'seniority', 'previous seen']
+
+SALARY_COLUMNS = ['salary employment mean', 'salary b2b mean']
+
+
+def build_cube(all_offers, dimensions=CUBE_DIMENSIONS):
+    # Liczba ofert oraz suma i liczba wynagrodzeń dla każdej obserwowanej kombinacji wymiarów
+    grouped = all_offers.groupby(dimensions, observed=True, dropna=False)
+    offers_cube = grouped.size().to_frame('count')
+    for column in SALARY_COLUMNS:
+        offers_cube[f"{column} sum"] = grouped[column].sum()
+        offers_cube[f"{column} count"] = grouped[column].count()
+    return restore_dimensions(offers_cube.reset_index(), all_offers, dimensions)
+
+
+def build_technology_cube(all_offers, technology_postings):
+    # Kostka, w której oferta liczy się raz dla każdej wymienionej technologii. Wiersze wybierane są
+    # z indeksu odwróconego, a kopiowane tylko kolumny potrzebne kostce - raz, przy wczytaniu danych
+    columns = [column for column in TECHNOLOGY_DIMENSIONS if column != 'technology'] + SALARY_COLUMNS
+    pairs = all_offers[columns].take(technology_postings['order']).assign(
+        technology=postings.posting_technologies(technology_postings))
+    return build_cube(pairs, TECHNOLOGY_DIMENSIONS)
+
+
+def build_history_cube(all_offers):
+    history_cube = all_offers.groupby(HISTORY_DIMENSIONS, observed=True, dropna=False).size().reset_index(name='count')
+    return restore_dimensions(history_cube, all_offers, HISTORY_DIMENSIONS)
+
+
+def restore_dimensions(cells, all_offers, dimensions):
+    # groupby z dropna=False i brakiem w którymś z kluczy gubi uporządkowanie kategorii (seniority, company size) -
+    # bez tego kostki porcji zależałyby od tego, czy porcja zawiera braki
+    for column in dimensions:
+        dtype = all_offers[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and cells[column].dtype != dtype:
+            cells[column] = cells[column].astype(dtype)
+    return cells
+
+
+def merge_cubes(cubes, dimensions):
+    # Kostki porcji tego samego zbioru: komórki o tych samych wymiarach sumowane - wynik nie zależy od podziału
+    # ofert na porcje i jest taki jak kostka zbudowana od razu ze wszystkich ofert
+    merged = pipeline.concat_months([part.copy(deep=False) for part in cubes])
+    return restore_dimensions(merged.groupby(dimensions, observed=True, dropna=False).sum().reset_index(), merged,
+                              dimensions)
+
+
+def offers_with_technologies(technology_cube, technologies):
+    # Kostka ofert dla filtra technologii, złożona z przefiltrowanej kostki technologii: oferta z kilkoma
+    # wybranymi technologiami liczy się raz - w wierszu pierwszej z nich na liście z ogłoszenia - a technologią
+    # kostki ofert jest znowu pierwsza wymieniona. Liczone na słowniku list technologii, nie na wierszach
+    selected = set(technologies)
+    combinations = [pipeline.split_technologies(value) for value in technology_cube['technologies'].cat.categories]
+    names = technology_cube['technology'].cat.categories
+    # Kod -1 (brak listy technologii) trafia na dopisane -1 - taki wiersz nie pasuje do żadnej technologii
+    representative = np.append(names.get_indexer(
+        [next((name for name in combination if name in selected), None) for combination in combinations]), -1)
+    primary = np.append(names.get_indexer([combination[0] for combination in combinations]), -1)
+
+    codes = technology_cube['technologies'].cat.codes.to_numpy()
+    rows = technology_cube['technology'].cat.codes.to_numpy() == representative[codes]
+    rows &= representative[codes] >= 0
+    offers = technology_cube[rows].drop(columns='technologies').assign(
+        technology=pd.Categorical.from_codes(primary[codes[rows]], categories=names))
+    return offers.groupby(CUBE_DIMENSIONS, observed=True, dropna=False).sum().reset_index()
+
+
+def latest_cube(offers_cube):
+    return offers_cube[offers_cube['report date'] == offers_cube['report date'].max()]
+
+
+def unique_offers(history_cube):
+    # Oferta widoczna w kilku miesiącach liczona raz - w pierwszym miesiącu wycinka, w którym się pojawia.
+    # Wcześniejsze wystąpienie sprzed wycinka nie wyklucza wiersza (NaT też nie)
+    return history_cube[~(history_cube['previous seen'] >= history_cube['report date'].min())]
+
+
+def rollup(offers_cube, dimensions, measure='count'):
+    return offers_cube.groupby(dimensions, observed=True)[measure].sum()
+
+
+def counts(offers_cube, dimension):
+    # Odpowiednik value_counts() na surowych ofertach: malejąco, bez pustych kategorii
+    result = rollup(offers_cube, dimension)
+    result = result[result > 0].sort_values(ascending=False, kind='stable')
+    result.index = result.index.astype(object)
+    return result
@@ -0,0 +1,217 @@
+import argparse
+import hashlib
+import html as html_escape
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import dash_bootstrap_components as dbc
+from dash import dcc, html
+from plotly.offline import get_plotlyjs
+
+import main
+from payload import payload
+from pipeline import pipeline
+from snapshot import snapshot
+
+TARGET_DIR = 'site'
+PLOTLY_BUNDLE = 'plotly.min.js'
+FIGURES_DIR = 'figures'
+MANIFEST = 'manifest.json'
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="pl">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<link rel="stylesheet" href="{stylesheet}">
+<script src="{bundle}"></script>
+</head>
+<body>
+{body}
+<script>
+const figures = {figures};
+for (const [name, figure] of Object.entries(figures)) {{
+    Plotly.newPlot("chart-" + name, figure.data, figure.layout, figure.config || {{}});
+}}
+</script>
+</body>
+</html>
+"""
+
+
+def page_file(pathname):
+    return 'index.html' if pathname == '/' else f"{pathname.strip('/')}.html"
+
+
+def code_key():
+    # Skrót źródeł modułów aplikacji - zmiana kodu wykresów unieważnia wyeksportowane pliki tak jak zmiana danych
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    paths = sorted({module.__file__ for module in list(sys.modules.values())
+                    if getattr(module, '__file__', None) and module.__file__.startswith(root)
+                    and module.__file__.endswith('.py')})
+    for path in paths:
+        with open(path, 'rb') as file:
+            digest.update(os.path.relpath(path, root).encode() + b'\0' + file.read())
+    return digest.hexdigest()[:16]
+
+
+def figure_key(name, dataset, code):
+    return hashlib.sha256(f"{dataset}|{code}|{name}".encode()).hexdigest()[:16]
+
+
+def read_manifest(target_dir):
+    try:
+        with open(os.path.join(target_dir, MANIFEST)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def write_file(path, data):
+    # Zapis przez plik tymczasowy - serwer CDN nie zobaczy połowy pliku
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+def script_json(figure_json):
+    # JSON wstawiany do <script> - "</" zamknąłby znacznik przedwcześnie
+    return figure_json.replace(b'</', b'<\\/').decode()
+
+
+def export_figure(name, target_dir):
+    # Uruchamiane w procesie roboczym; po fork dane i kostki są już wczytane w module main (export_site)
+    figure_json = payload.dumps(main.CHARTS[name](main.current_view(None, None, None, None)))
+    write_file(os.path.join(target_dir, FIGURES_DIR, f"{name}.json"), figure_json)
+    write_file(os.path.join(target_dir, FIGURES_DIR, f"{name}.html"), PAGE_TEMPLATE.format(
+        title=html_escape.escape(name), stylesheet=dbc.themes.BOOTSTRAP, bundle=f"../{PLOTLY_BUNDLE}",
+        body=f'<div id="chart-{name}"></div>', figures=f'{{"{name}": {script_json(figure_json)}}}').encode())
+    return name
+
+
+def style_css(style):
+    properties = []
+    for name, value in (style or {}).items():
+        name = ''.join(f"-{char.lower()}" if char.isupper() else char for char in name)
+        properties.append(f"{name}: {value}")
+    return '; '.join(properties)
+
+
+def render(component, charts):
+    # Drzewo komponentów Dash jako statyczny HTML; wykresy zastępuje pusty div wypełniany przez Plotly.newPlot
+    if component is None:
+        return ''
+    if isinstance(component, (list, tuple)):
+        return ''.join(render(child, charts) for child in component)
+    if isinstance(component, (str, int, float)):
+        return html_escape.escape(str(component))
+    if isinstance(component, dcc.Graph):
+        charts.append(component.id['name'])
+        return f'<div id="chart-{component.id["name"]}"></div>'
+    if isinstance(component, dcc.Loading):
+        return render(component.children, charts)
+
+    classes = [getattr(component, 'className', None)]
+    if isinstance(component, dbc.Row):
+        tag, classes = 'div', ['row'] + classes
+    elif isinstance(component, dbc.Col):
+        width = getattr(component, 'width', None)
+        tag, classes = 'div', [f"col-{width}" if width else 'col'] + classes
+    elif isinstance(component, dbc.NavLink):
+        tag, classes = 'a', ['nav-link'] + classes
+    elif isinstance(component, dbc.Nav):
+        tag, classes = 'nav', ['nav', 'flex-column', 'nav-pills'] + classes
+    else:
+        tag = type(component).__name__.lower()
+
+    attributes = ''
+    if any(classes):
+        attributes += f' class="{" ".join(value for value in classes if value)}"'
+    if getattr(component, 'style', None):
+        attributes += f' style="{html_escape.escape(style_css(component.style))}"'
+    for name in ('href', 'target'):
+        value = getattr(component, name, None)
+        if value is not None:
+            if name == 'href' and value.startswith('/'):
+                value = page_file(value)
+            attributes += f' {name}="{html_escape.escape(value)}"'
+    if tag == 'hr':
+        return f'<hr{attributes}>'
+    return f'<{tag}{attributes}>{render(getattr(component, "children", None), charts)}</{tag}>'
+
+
+def export_page(pathname, target_dir):
+    title, layout = main.PAGES[pathname]
+    # Menu bez filtrów - w statycznej wersji nie ma serwera, który przeliczyłby wykresy
+    sidebar = html.Div([
+        html.P("Nawigacja", className="lead", style={"color": "white"}),
+        html.Hr(),
+        dbc.Nav([dbc.NavLink(page_title, href=page) for page, (page_title, _) in main.PAGES.items()]),
+    ], style=main.SIDEBAR_STYLE)
+
+    charts = []
+    body = render([sidebar, layout()], charts)
+    figures = []
+    for name in charts:
+        with open(os.path.join(target_dir, FIGURES_DIR, f"{name}.json"), 'rb') as file:
+            figures.append(f'"{name}": {script_json(file.read())}')
+    write_file(os.path.join(target_dir, page_file(pathname)), PAGE_TEMPLATE.format(
+        title=html_escape.escape(title), stylesheet=dbc.themes.BOOTSTRAP, bundle=PLOTLY_BUNDLE,
+        body=body, figures=f"{{{', '.join(figures)}}}").encode())
+
+
+def pool_context():
+    # fork: procesy robocze dziedziczą wczytane dane zamiast wczytywać je ponownie
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def export_site(target_dir=TARGET_DIR, workers=None, force=False):
+    os.makedirs(os.path.join(target_dir, FIGURES_DIR), exist_ok=True)
+    bundle = get_plotlyjs().encode()
+    bundle_path = os.path.join(target_dir, PLOTLY_BUNDLE)
+    if not os.path.exists(bundle_path) or os.path.getsize(bundle_path) != len(bundle):
+        write_file(bundle_path, bundle)
+
+    # Dane wczytane przed utworzeniem puli - procesy robocze dostają je przez fork
+    main.ensure_data()
+    dataset = snapshot.dataset_key(pipeline.find_dataset_files())
+    code = code_key()
+    previous = read_manifest(target_dir).get('figures', {})
+    keys = {name: figure_key(name, dataset, code) for name in main.CHARTS}
+    stale = [name for name, key in keys.items()
+             if force or previous.get(name) != key
+             or not os.path.exists(os.path.join(target_dir, FIGURES_DIR, f"{name}.json"))]
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=pool_context()) as executor:
+            list(executor.map(export_figure, stale, [target_dir] * len(stale)))
+
+    for pathname in main.PAGES:
+        export_page(pathname, target_dir)
+    write_file(os.path.join(target_dir, MANIFEST), json.dumps({'figures': keys}, indent=2).encode())
+    return stale
+
+
+def cli():
+    parser = argparse.ArgumentParser(description="Statyczny eksport stron i wykresów dashboardu")
+    parser.add_argument('target', nargs='?', default=TARGET_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="zbuduj wszystkie wykresy, także niezmienione")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stale = export_site(args.target, args.workers, args.force)
+    print(f"Zbudowano {len(stale)} z {len(main.CHARTS)} wykresów, {len(main.PAGES)} stron w {args.target} "
+          f"({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from cube import cube
+from postings import postings
+
+FILTER_DIMENSIONS = ['location', 'technology', 'seniority']
+# Wymiar wielowartościowy -> kolumna z pełną listą wartości (kategoria na każdą kombinację)
+MULTI_VALUED = {'technology': 'technologies'}
+
+
+def normalize_selection(start_date=None, end_date=None, locations=None, technologies=None, seniorities=None):
+    # Krotka niezależna od kolejności wyboru - służy też jako klucz cache
+    return (
+        start_date,
+        end_date,
+        tuple(sorted(locations)) if locations else None,
+        tuple(sorted(technologies)) if technologies else None,
+        tuple(sorted(seniorities)) if seniorities else None,
+    )
+
+
+def is_empty_selection(selection):
+    return all(value is None for value in selection)
+
+
+def build_index(frame):
+    # Dla każdego wymiaru: wiersze posortowane wg kodu kategorii i granice przedziałów (format CSR),
+    # czyli lista numerów wierszy dla każdej wartości bez osobnej tablicy na każdą wartość
+    index = {'size': len(frame), 'dimensions': {}}
+    for dimension in FILTER_DIMENSIONS:
+        if dimension in MULTI_VALUED and MULTI_VALUED[dimension] in frame:
+            # Ta sama struktura, ale wiersz może należeć do kilku wartości (indeks odwrócony).
+            # Szkice mają tylko pierwszą technologię oferty - tam zwykły indeks po wartości
+            technology_postings = postings.build_postings(frame)
+            index['dimensions'][dimension] = {
+                'values': pd.Index(technology_postings['technologies']),
+                'order': technology_postings['order'],
+                'bounds': technology_postings['bounds'],
+            }
+            continue
+        codes = frame[dimension].cat.codes.to_numpy()
+        categories = frame[dimension].cat.categories
+        order = np.argsort(codes, kind='stable').astype('int32')
+        index['dimensions'][dimension] = {
+            'values': categories,
+            'order': order,
+            'bounds': np.searchsorted(codes[order], np.arange(len(categories) + 1)),
+        }
+
+    # Miesiące są dopisywane po kolei, więc zakres dat to zwykle ciągły przedział wierszy
+    dates = frame['report date'].to_numpy()
+    index['dates'] = dates
+    index['dates sorted'] = bool(np.all(dates[:-1] <= dates[1:]))
+    return index
+
+
+def select_rows(index, selection):
+    start_date, end_date = selection[:2]
+    mask = np.zeros(index['size'], dtype=bool)
+
+    dates = index['dates']
+    if index['dates sorted']:
+        start = np.searchsorted(dates, np.datetime64(start_date), 'left') if start_date is not None else 0
+        end = np.searchsorted(dates, np.datetime64(end_date), 'right') if end_date is not None else len(dates)
+        mask[start:end] = True
+    else:
+        mask[:] = True
+        if start_date is not None:
+            mask &= dates >= np.datetime64(start_date)
+        if end_date is not None:
+            mask &= dates <= np.datetime64(end_date)
+
+    for dimension, values in zip(FILTER_DIMENSIONS, selection[2:]):
+        if values is None:
+            continue
+        entry = index['dimensions'][dimension]
+        positions = entry['values'].get_indexer(values)
+        dimension_mask = np.zeros(index['size'], dtype=bool)
+        for position in positions[positions >= 0]:
+            dimension_mask[entry['order'][entry['bounds'][position]:entry['bounds'][position + 1]]] = True
+        mask &= dimension_mask
+
+    return np.flatnonzero(mask)
+
+
+def filter_cube(offers_cube, selection, index=None):
+    # Indeks zbudowany raz na wersję danych (main.build_state); bez niego budowany na miejscu
+    if index is None:
+        index = build_index(offers_cube)
+    return offers_cube.take(select_rows(index, selection))
+
+
+def filtered_view(cubes, indexes, selection, version=None):
+    # cubes: kostki i szkice filtrowane tak samo, indexes: ich indeksy (build_index). Kostka ofert nie ma
+    # listy technologii - przy filtrze technologii powstaje z przefiltrowanej kostki technologii
+    # (cube.offers_with_technologies)
+    view = {}
+    for name, frame in cubes.items():
+        if name != 'offers_cube':
+            view[name] = filter_cube(frame, selection, indexes[name])
+    technologies = selection[2 + FILTER_DIMENSIONS.index('technology')]
+    if technologies is None:
+        view['offers_cube'] = filter_cube(cubes['offers_cube'], selection, indexes['offers_cube'])
+    else:
+        view['offers_cube'] = cube.offers_with_technologies(view['technology_cube'], technologies)
+    view['latest_cube'] = cube.latest_cube(view['offers_cube'])
+    view['latest_history_cube'] = cube.latest_cube(view['history_cube'])
+    view['latest_technology_cube'] = cube.latest_cube(view['technology_cube'])
+    # Klucz dla cache wykresów: wersja danych i wybór filtrów zamiast tożsamości tymczasowej ramki
+    for name, frame in view.items():
+        frame.attrs['cache_key'] = (name, version, selection)
+    return view
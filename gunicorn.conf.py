@@ -0,0 +1,19 @@
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:server'
+bind = os.environ.get('BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('THREADS', 2))
+timeout = 60
+
+# Aplikacja ładowana raz w procesie nadrzędnym, domyślnie razem z danymi (wsgi.py)
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Wątki nie przechodzą przez fork - każdy worker rozgrzewa wykresy w tle (chyba że zrobił to już proces
+    # nadrzędny, WARMUP_BEFORE_FORK=1) i uruchamia watcher
+    import main
+
+    main.start_background()
@@ -0,0 +1,112 @@
+import numpy as np
+
+
+def nice_bin_size(raw_size):
+    # Zaokrąglenie w górę do 1, 2 lub 5 razy potęga dziesięciu - tak jak automatyczne kubełki w plotly.js
+    if not np.isfinite(raw_size) or raw_size <= 0:
+        return 1.0
+    base = 10 ** np.floor(np.log10(raw_size))
+    for step in (1, 2, 5, 10):
+        if raw_size <= step * base:
+            return float(step * base)
+
+
+def auto_bin_size(values, nbins=None, weights=None):
+    values = np.asarray(values, dtype='float64')
+    if values.size == 0:
+        return 1.0
+    if nbins:
+        return nice_bin_size((values.max() - values.min()) / nbins)
+    if weights is None:
+        return nice_bin_size(2 * values.std() / values.size ** 0.4)
+    weights = np.asarray(weights, dtype='float64')
+    mean = np.average(values, weights=weights)
+    std = np.sqrt(np.average((values - mean) ** 2, weights=weights))
+    return nice_bin_size(2 * std / weights.sum() ** 0.4)
+
+
+def bin_edges(values, bin_size):
+    values = np.asarray(values, dtype='float64')
+    if values.size == 0:
+        return np.array([0.0, bin_size])
+    low = np.floor(values.min() / bin_size) * bin_size
+    high = (np.floor(values.max() / bin_size) + 1) * bin_size
+    return np.arange(low, high + bin_size / 2, bin_size)
+
+
+def histogram_trace(values, edges, weights=None, **bar_options):
+    counts, _ = np.histogram(np.asarray(values, dtype='float64'), bins=edges, weights=weights)
+    # Wagi to liczby ofert, więc liczności zostają całkowite
+    return bar_trace(edges, np.rint(counts).astype('int64'), **bar_options)
+
+
+def bar_trace(edges, counts, bargap=0.0, **bar_options):
+    edges = np.asarray(edges, dtype='float64')
+    counts = np.asarray(counts)
+    nonempty = np.flatnonzero(counts > 0)
+    return bins_trace(edges[0], edges[1] - edges[0], nonempty, counts[nonempty], bargap=bargap, **bar_options)
+
+
+def bins_trace(low, bin_size, bins, counts, bargap=0.0, **bar_options):
+    import plotly.graph_objects as go
+
+    # Do przeglądarki trafiają tylko niepuste kubełki (środek i liczność), a nie surowe wartości
+    return go.Bar(
+        x=low + (np.asarray(bins) + 0.5) * bin_size,
+        y=counts,
+        width=bin_size * (1 - bargap),
+        **bar_options
+    )
+
+
+def grouped_histograms(frame, keys, value_column, nbins=50, weights=None):
+    # Jedno przejście: liczność, mediana, kubełki (nbins na grupę) i liczności dla wszystkich grup naraz
+    grouped = frame.groupby(keys, observed=True)[value_column]
+    stats = grouped.agg(['min', 'max'])
+    stats['bin size'] = [nice_bin_size(raw_size) for raw_size in (stats['max'] - stats['min']) / nbins]
+    stats['low'] = np.floor(stats['min'] / stats['bin size']) * stats['bin size']
+
+    # Wiersze z brakującym kluczem (NaN lub -1) albo brakującą wartością nie należą do żadnej grupy
+    group = grouped.ngroup().to_numpy(dtype='float64')
+    values = frame[value_column].to_numpy(dtype='float64')
+    weights = np.ones(len(frame)) if weights is None else np.asarray(weights, dtype='float64')
+    valid = (group >= 0) & ~np.isnan(values)
+    group, values, weights = group[valid].astype('int64'), values[valid], weights[valid]
+
+    stats['count'] = np.rint(np.bincount(group, weights, minlength=len(stats))).astype('int64')
+    stats['median'] = grouped_quantiles(group, values, weights, len(stats), [0.5])[:, 0]
+    bins = np.floor((values - stats['low'].to_numpy()[group]) / stats['bin size'].to_numpy()[group]).astype('int64')
+
+    # Para (grupa, kubełek) zakodowana jako jedna liczba, policzona jednym np.unique
+    width = bins.max() + 1 if bins.size else 1
+    cells, cell_index = np.unique(group * width + bins, return_inverse=True)
+    counts = np.rint(np.bincount(cell_index.ravel(), weights, minlength=len(cells))).astype('int64')
+    cell_groups, cell_bins = np.divmod(cells, width)
+
+    max_count = np.zeros(len(stats), dtype='int64')
+    np.maximum.at(max_count, cell_groups, counts)
+    stats['max count'] = max_count
+
+    boundaries = np.searchsorted(cell_groups, np.arange(len(stats) + 1))
+    histograms = [(cell_bins[start:end], counts[start:end]) for start, end in zip(boundaries[:-1], boundaries[1:])]
+    return stats, histograms
+
+
+def grouped_quantiles(group, values, weights, groups, quantiles):
+    # Kwantyle jak w plotly (pozycja p*N - 0.5 z interpolacją liniową), dla mediany to zwykła mediana.
+    # Wagi są całkowite (liczba identycznych ofert), więc wynik jest dokładnie taki jak na rozwiniętych danych
+    order = np.lexsort((values, group))
+    group, values, weights = group[order], values[order], weights[order]
+    cumulative = np.cumsum(weights)
+    totals = np.bincount(group, weights, minlength=groups)
+    before = np.cumsum(totals) - totals
+
+    result = np.full((groups, len(quantiles)), np.nan)
+    filled = totals > 0
+    for column, quantile in enumerate(quantiles):
+        position = np.clip(quantile * totals[filled] - 0.5, 0, totals[filled] - 1)
+        lower, upper = np.floor(position), np.ceil(position)
+        low_values = values[np.searchsorted(cumulative, before[filled] + lower, side='right')]
+        high_values = values[np.searchsorted(cumulative, before[filled] + upper, side='right')]
+        result[filled, column] = low_values + (position - lower) * (high_values - low_values)
+    return result
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+
+# Numery miesięcy w indeksie - mieszczą się w int16, a tablice indeksu rosną z liczbą ofert
+CODE_DTYPE = 'int16'
+
+
+def build_index(hashes, report_dates):
+    report_dates = np.asarray(report_dates, dtype='datetime64[ns]')
+    months = np.unique(report_dates)
+    return index_months(months, hashes, np.searchsorted(months, report_dates))
+
+
+def index_months(months, hashes, month_codes):
+    # Pary (id, miesiąc) posortowane po id, a potem po miesiącu - każde pytanie o historię oferty
+    # to wyszukiwanie binarne albo różnica sąsiednich elementów, bez słowników i pętli po ofertach
+    hashes = np.asarray(hashes, dtype='uint64')
+    month_codes = np.asarray(month_codes).astype(CODE_DTYPE)
+    order = np.lexsort((month_codes, hashes))
+    hashes, month_codes = hashes[order], month_codes[order]
+    duplicate = np.zeros(len(hashes), dtype=bool)
+    duplicate[1:] = (hashes[1:] == hashes[:-1]) & (month_codes[1:] == month_codes[:-1])
+    if duplicate.any():
+        hashes, month_codes = hashes[~duplicate], month_codes[~duplicate]
+    return sorted_index(months, hashes, month_codes)
+
+
+def sorted_index(months, hashes, month_codes):
+    same_as_previous = np.zeros(len(hashes), dtype=bool)
+    same_as_previous[1:] = hashes[1:] == hashes[:-1]
+    starts = np.flatnonzero(~same_as_previous)
+    ends = np.r_[starts, len(hashes)][1:]
+    return {
+        'months': months,
+        'hashes': hashes,
+        'month codes': month_codes,
+        'previous codes': np.where(same_as_previous, np.roll(month_codes, 1), -1).astype(CODE_DTYPE),
+        'ids': hashes[starts],
+        'first seen': month_codes[starts],
+        'last seen': month_codes[ends - 1],
+        'months listed': (ends - starts).astype(CODE_DTYPE),
+    }
+
+
+def earlier_pairs(index, hashes, codes):
+    # Pozycja pierwszej pary każdego id i liczba jego par z miesięcy wcześniejszych niż codes. Pary oferty
+    # leżą obok siebie w kolejności miesięcy, więc wystarczy krok na miesiąc - pamięć zależy tylko od liczby
+    # pytań (porcji wierszy), a nie od wielkości indeksu
+    pair_hashes, pair_codes = index['hashes'], index['month codes']
+    first = np.searchsorted(pair_hashes, hashes, side='left')
+    end = np.searchsorted(pair_hashes, hashes, side='right')
+    earlier = np.zeros(len(hashes), dtype='int64')
+    for step in range(len(index['months'])):
+        position = first + step
+        inside = position < end
+        if not inside.any():
+            break
+        inside[inside] = pair_codes[position[inside]] < codes[inside]
+        earlier += inside
+    return first, earlier
+
+
+def append_months(index, hashes, report_dates):
+    # Nowe pary wstawiane w posortowane tablice indeksu (np.insert) - bez ponownego sortowania całej historii
+    report_dates = np.asarray(report_dates, dtype='datetime64[ns]')
+    months = np.union1d(index['months'], report_dates)
+    month_codes = index['month codes']
+    remapped = np.searchsorted(months, index['months']).astype(CODE_DTYPE)
+    if not np.array_equal(remapped, np.arange(len(remapped))):
+        # Nowy miesiąc wcześniejszy niż któryś ze znanych - numery dotychczasowych par się przesuwają
+        month_codes = remapped[month_codes]
+    index = {**index, 'months': months, 'month codes': month_codes}
+
+    new = index_months(months, hashes, np.searchsorted(months, report_dates))
+    first, earlier = earlier_pairs(index, new['hashes'], new['month codes'])
+    position = first + earlier
+    # Para już obecna w indeksie (ten sam miesiąc wczytany ponownie) nie jest dodawana drugi raz
+    known = position < len(index['hashes'])
+    known[known] = (index['hashes'][position[known]] == new['hashes'][known]) & \
+        (month_codes[position[known]] == new['month codes'][known])
+    return sorted_index(months, np.insert(index['hashes'], position[~known], new['hashes'][~known]),
+                        np.insert(month_codes, position[~known], new['month codes'][~known]))
+
+
+def previous_seen(index, hashes, report_dates):
+    # Miesiąc poprzedniego wystąpienia tej samej oferty (NaT, jeśli wcześniej jej nie było).
+    # Działa też dla miesięcy spoza indeksu, np. właśnie wczytywanych
+    months = index['months']
+    first, earlier = earlier_pairs(index, np.asarray(hashes, dtype='uint64'),
+                                   np.searchsorted(months, np.asarray(report_dates, dtype='datetime64[ns]')))
+    found = earlier > 0
+    result = np.full(len(found), np.datetime64('NaT'), dtype='datetime64[ns]')
+    result[found] = months[index['month codes'][(first + earlier - 1)[found]]]
+    return result
+
+
+def churn(index):
+    # Dla każdego miesiąca: oferty obecne, nowe, przeniesione z poprzedniego miesiąca, powracające i usunięte
+    months = len(index['months'])
+    codes, previous = index['month codes'], index['previous codes']
+    offers = np.bincount(codes, minlength=months)
+    carried = np.bincount(codes[(previous >= 0) & (previous == codes - 1)], minlength=months)
+    return pd.DataFrame({
+        'report date': index['months'],
+        'offers': offers,
+        'new': np.bincount(codes[previous < 0], minlength=months),
+        'carried over': carried,
+        'returning': np.bincount(codes[(previous >= 0) & (previous < codes - 1)], minlength=months),
+        'removed': np.r_[0, offers[:-1] - carried[1:]],
+    })
+
+
+def unique_offers(index):
+    return len(index['ids'])
+
+
+def lifetimes(index):
+    # Liczba miesięcy, w których oferta była widoczna -> liczba ofert
+    counts = np.bincount(index['months listed'], minlength=len(index['months']) + 1)[1:]
+    return pd.Series(counts, index=pd.RangeIndex(1, len(counts) + 1, name='months listed'), name='offers')
+
+
+def mark_previous_seen(all_offers, index):
+    return all_offers.assign(**{
+        'previous seen': previous_seen(index, all_offers['id hash'], all_offers['report date'])})
@@ -0,0 +1,100 @@
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Opcjonalna pełniejsza tabela (kolumny jak w LOCATIONS); bez niej wbudowana lista miast
+LOCATIONS_FILE = os.path.join('dataset', 'locations.csv')
+LOCATION_COLUMNS = ['name', 'population', 'lat', 'lon', 'region']
+
+# Populacja w tysiącach mieszkańców (dane przybliżone), współrzędne centrum i województwo
+LOCATIONS = [
+    ('Warszawa', 1862, 52.2297, 21.0122, 'mazowieckie'),
+    ('Kraków', 808, 50.0647, 19.9450, 'małopolskie'),
+    ('Wrocław', 674, 51.1079, 17.0385, 'dolnośląskie'),
+    ('Poznań', 537, 52.4064, 16.9252, 'wielkopolskie'),
+    ('Gdańsk', 488, 54.3520, 18.6466, 'pomorskie'),
+    ('Katowice', 286, 50.2649, 19.0238, 'śląskie'),
+    ('Łódź', 649, 51.7592, 19.4560, 'łódzkie'),
+    ('Lublin', 329, 51.2465, 22.5684, 'lubelskie'),
+    ('Szczecin', 388, 53.4285, 14.5528, 'zachodniopomorskie'),
+    ('Bydgoszcz', 325, 53.1235, 18.0084, 'kujawsko-pomorskie'),
+    ('Białystok', 291, 53.1325, 23.1688, 'podlaskie'),
+    ('Rzeszów', 197, 50.0412, 21.9991, 'podkarpackie'),
+    ('Toruń', 195, 53.0138, 18.5984, 'kujawsko-pomorskie'),
+    ('Gdynia', 243, 54.5189, 18.5305, 'pomorskie'),
+    ('Gliwice', 171, 50.2945, 18.6714, 'śląskie'),
+    ('Kielce', 186, 50.8661, 20.6286, 'świętokrzyskie'),
+    ('Olsztyn', 170, 53.7784, 20.4801, 'warmińsko-mazurskie'),
+    ('Opole', 126, 50.6751, 17.9213, 'opolskie'),
+    ('Zielona Góra', 139, 51.9356, 15.5062, 'lubuskie'),
+    ('Bielsko-Biała', 168, 49.8224, 19.0584, 'śląskie'),
+]
+
+# Inne zapisy spotykane w ogłoszeniach; warianty wielkości liter, spacji i polskich znaków obsługuje normalize_location
+ALIASES = {
+    'Warsaw': 'Warszawa',
+    'Cracow': 'Kraków',
+}
+
+NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+
+@lru_cache(maxsize=None)
+def normalize_location(value):
+    # Wywoływane raz na różną wartość surową (kategorię), nie na wiersz
+    if not isinstance(value, str):
+        return None
+    # Dopiski po przecinku lub w nawiasie, np. "Warszawa, mazowieckie" albo "Kraków (hybrydowo)"
+    value = re.split(r'[,(]', value, maxsplit=1)[0]
+    # "ł" nie rozkłada się w NFKD na literę i znak diakrytyczny
+    value = unicodedata.normalize('NFKD', value.casefold().replace('ł', 'l'))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return NON_ALPHANUMERIC.sub(' ', value).strip() or None
+
+
+def build_location_table(locations, aliases=None):
+    table = pd.DataFrame(locations, columns=LOCATION_COLUMNS)
+    table.insert(1, 'key', [normalize_location(name) for name in table['name']])
+    table = table.drop_duplicates('key', ignore_index=True)
+    keys = {key: row for row, key in enumerate(table['key'])}
+    for alias, name in (aliases or {}).items():
+        if normalize_location(name) in keys:
+            keys.setdefault(normalize_location(alias), keys[normalize_location(name)])
+    return table, keys
+
+
+@lru_cache(maxsize=None)
+def location_table(path=LOCATIONS_FILE):
+    if os.path.exists(path):
+        return build_location_table(pd.read_csv(path, usecols=LOCATION_COLUMNS), ALIASES)
+    return build_location_table(LOCATIONS, ALIASES)
+
+
+def join_locations(frame, column='location', columns=LOCATION_COLUMNS):
+    # Złączenie z tabelą wymiaru po kodzie kategorii: dla każdej kategorii raz pozycja w tabeli,
+    # a dla wierszy tylko take po kodach na tablicy wymiaru (bez map i bez napisów na wiersz)
+    table, keys = location_table()
+    values = frame[column]
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype('category')
+    # Pozycja 0 to brak dopasowania (również kod -1, czyli brak lokalizacji), kategorie od pozycji 1
+    rows = np.array([-1] + [keys.get(normalize_location(value), -1) for value in values.cat.categories],
+                    dtype=np.intp)
+    positions = values.cat.codes.to_numpy().astype(np.intp) + 1
+
+    # Płytka kopia i dopisanie kolumn - assign kopiowałby całą ramkę
+    joined = frame.copy(deep=False)
+    for name in columns:
+        if table[name].dtype == object:
+            # Napisy (nazwa, województwo) jako kategorie - na wiersz przypada tylko kod
+            codes, categories = pd.factorize(table[name])
+            joined['location name' if name == 'name' else name] = pd.Categorical.from_codes(
+                np.append(codes, -1)[rows].take(positions), categories=categories, validate=False)
+        else:
+            missing = 0 if name == 'population' else np.nan
+            joined[name] = np.append(table[name].to_numpy(), missing)[rows].take(positions)
+    return joined
@@ -1,60 +1,73 @@
+import logging
+import os
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
 import dash
-import dash_bootstrap_components as dbc
-import numpy as np
+import flask
 import pandas as pd
-from dash import dcc, html, Input, Output
+import dash_bootstrap_components as dbc
+from dash import dcc, html, Input, Output, MATCH
 
+# Moduły wykresów importują plotly dopiero w funkcjach show_*, więc import main (workery, eksport,
+# benchmarki) nie ładuje plotly.express - zmierzone w benchmarks/imports.py
+from aggregates import aggregates
 from offers import offers
 from salary import salary
 from seniority import seniority
 from technologies import technologies
 from contracts import contracts
+from churn import churn
+from cube import cube
+from cache import cache
+from metrics import metrics
+from payload import payload
+from filters import filters
+from identity import identity
+from pipeline import pipeline
+from snapshot import snapshot
+from stream import stream
+from warmup import warmup
+from watcher import watcher
 
-csv_files = {
-    '2023-09-01': pd.read_csv('./dataset/202309_soft_eng_jobs_pol.csv'),
-    '2023-10-01': pd.read_csv('./dataset/202310_soft_eng_jobs_pol.csv'),
-    '2023-11-01': pd.read_csv('./dataset/202311_soft_eng_jobs_pol.csv'),
-    '2023-12-01': pd.read_csv('./dataset/202312_soft_eng_jobs_pol.csv'),
-    '2024-01-01': pd.read_csv('./dataset/202401_soft_eng_jobs_pol.csv'),
-    '2024-02-01': pd.read_csv('./dataset/202402_soft_eng_jobs_pol.csv'),
-    '2024-03-01': pd.read_csv('./dataset/202403_soft_eng_jobs_pol.csv'),
-    '2024-04-01': pd.read_csv('./dataset/202404_soft_eng_jobs_pol.csv'),
-    '2024-05-01': pd.read_csv('./dataset/202405_soft_eng_jobs_pol.csv'),
-    '2024-06-01': pd.read_csv('./dataset/202406_soft_eng_jobs_pol.csv')
-}
+metrics.histogram('dashboard_layout_seconds', "Czas budowy szkieletu strony (layout_*)")
+metrics.histogram('dashboard_callback_seconds', "Czas obsługi callbacków Dash")
+
+# OFFERS_STREAMING=1: pliki czytane porcjami i od razu zwijane do kostek i szkiców, bez ramki wierszy -
+# dla danych większych niż pamięć
+STREAMING = os.environ.get('OFFERS_STREAMING') == '1'
+
+logger = logging.getLogger(__name__)
+
+# Wszystkie dane jednej wersji zbioru w jednym niezmiennym obiekcie - publish_state podmienia go jednym
+# przypisaniem, więc żądanie w trakcie aktualizacji widzi w całości stary albo w całości nowy zbiór
+class DataState(namedtuple('DataState', [
+    'version', 'all_offers', 'offer_index', 'offers_cube', 'latest_cube', 'history_cube', 'latest_history_cube',
+    'technology_cube', 'latest_technology_cube', 'salary_sketches', 'company_size_sketches', 'range_sketches',
+    'filter_indexes', 'offer_churn', 'offer_lifetimes',
+    'technology_colors', 'location_colors',
+])):
+    __slots__ = ()
+
+    # W kluczach cache (cached_filtered_view) stan reprezentuje jego wersja, a nie zawartość ramek
+    def __hash__(self):
+        return hash(self.version)
+
+    def __eq__(self, other):
+        return self is other
 
-dfs = []
-for report_date in csv_files:
-    df = csv_files[report_date]
-    df['report date'] = report_date
-    df['report date'] = pd.to_datetime(df['report date'])
-    dfs.append(df)
-
-all_offers = pd.concat(dfs)
-
-columns = all_offers.columns.to_list()
-all_offers['salary employment mean'] = round(
-    all_offers['salary employment min'] * 0.5 + all_offers['salary employment max'] * 0.5)
-all_offers['salary b2b mean'] = round(all_offers['salary b2b min'] * 0.5 + all_offers['salary b2b max'] * 0.5)
-all_offers['contract type'] = all_offers.apply(lambda x: 'both' if (
-        (np.isnan(x['salary employment mean']) == False) & (np.isnan(x['salary b2b mean']) == False)) else False,
-                                               axis=1)
-all_offers['contract type'] = all_offers.apply(
-    lambda x: 'b2b' if ((x['contract type'] == False) & (np.isnan(x['salary employment mean']) == True)) else x[
-        'contract type'], axis=1)
-all_offers['contract type'] = all_offers.apply(
-    lambda x: 'employment' if ((x['contract type'] == False) & (np.isnan(x['salary b2b mean']) == True)) else x[
-        'contract type'], axis=1)
-all_offers['contract type'] = all_offers.apply(
-    lambda x: 'none' if (x['contract type'] == False) else x['contract type'], axis=1)
-all_offers['company size'] = all_offers['company size'].transform(lambda x: None if np.isnan(x) else min(10000, x))
-all_offers['company size'] = all_offers['company size'].transform(
-    lambda x: None if np.isnan(x) else str(round(x)) + "+")
-all_offers['is remote'] = all_offers['location'].transform(lambda x: 'Non Remote' if x != 'Remote' else x)
-latest = all_offers[all_offers['report date'] == all_offers['report date'].unique().max()]
-
-unique_technologies = all_offers["technology"].unique()
-unique_cities = all_offers["location"].unique()
+
+# Import nie wczytuje danych - robi to ensure_data() przy pierwszym użyciu, przy serwerze proces nadrzędny
+# (wsgi.py) albo wątek rozgrzewania (start_warmup), w którym strona główna odpowiada od razu;
+# do tego czasu data jest puste
+data = None
+data_lock = threading.Lock()
+# Wątki rozgrzewania i watchera - najwyżej po jednym w procesie (post_fork, pierwsze żądanie, __main__)
+warmup_thread = watcher_thread = None
+background_lock = threading.Lock()
+
+warmup_progress = warmup.Progress()
 
 # Paleta dostosowana dla osób z zaburzeniami widzenia barw
 colors = [
@@ -64,11 +77,198 @@ colors = [
     '#c49c94', '#f7b6d2', '#c7c7c7', '#dbdb8d', '#9edae5'
 ]
 
-technology_colors = dict(zip(unique_technologies, colors[:len(unique_technologies)]))
-location_colors = dict(zip(unique_cities, colors[:len(unique_cities)]))
+
+def build_color_map(values):
+    unique_values = values.unique()
+    return dict(zip(unique_values, colors[:len(unique_values)]))
+
+
+# Wykresy zapisane jako JSON - dane zmieniają się raz w miesiącu, a nie przy każdym przejściu między stronami
+figure_cache = cache.FigureCache(maxsize=256)
+
+
+def cached(function, *args, **kwargs):
+    return figure_cache.get(function, *args, **kwargs)
+
+
+def load_data():
+    global data
+
+    if STREAMING:
+        # Bez ramki ofert - kostki i szkice składane porcja po porcji prosto z plików
+        all_offers = None
+        offer_aggregates, offer_index = stream.aggregate_offers()
+    else:
+        all_offers, _ = snapshot.load_prepared_offers()
+        # Indeks ofert po skrótach id: unikalne oferty i ich historia z miesiąca na miesiąc
+        offer_index = identity.build_index(all_offers['id hash'], all_offers['report date'])
+        all_offers = identity.mark_previous_seen(all_offers, offer_index)
+        offer_aggregates = aggregates.build_aggregates(all_offers)
+    data = build_state(0, all_offers, offer_index, offer_aggregates)
+
+
+def build_state(version, all_offers, offer_index, offer_aggregates):
+    # all_offers tylko w trybie w pamięci (do zapisu snapshotu) - wykresy korzystają wyłącznie z kostek i szkiców
+    offers_cube = offer_aggregates['offers_cube']
+    state = DataState(
+        version=version,
+        all_offers=all_offers,
+        offer_index=offer_index,
+        latest_cube=cube.latest_cube(offers_cube),
+        latest_history_cube=cube.latest_cube(offer_aggregates['history_cube']),
+        latest_technology_cube=cube.latest_cube(offer_aggregates['technology_cube']),
+        # Listy wierszy dla każdej wartości filtra, raz na wersję danych - zmiana filtrów tylko je scala
+        filter_indexes={name: filters.build_index(frame) for name, frame in offer_aggregates.items()},
+        offer_churn=identity.churn(offer_index),
+        offer_lifetimes=identity.lifetimes(offer_index),
+        # Nowe miesiące są dopisywane na końcu, więc dotychczasowe kolory technologii i miast się nie zmieniają
+        technology_colors=build_color_map(offers_cube["technology"]),
+        location_colors=build_color_map(offers_cube["location"]),
+        **offer_aggregates,
+    )
+    # Klucz dla cache wykresów jak w widokach przefiltrowanych (filters.filtered_view) - z wersją danych,
+    # a nie id ramki, które po podmianie stanu może przypaść nowej ramce
+    for name, frame in state._asdict().items():
+        if isinstance(frame, (pd.DataFrame, pd.Series)):
+            frame.attrs['cache_key'] = (name, version, None)
+    return state
+
+
+def state_aggregates(state):
+    return {name: getattr(state, name) for name in aggregates.DIMENSIONS}
+
+
+def ensure_data():
+    # Równoległe wywołania (wątek rozgrzewania, callback wykresu, eksport) czekają na jedno wczytanie
+    if data is None:
+        with data_lock:
+            if data is None:
+                load_data()
+    return data
+
+
+def warm_up():
+    warmup_progress.begin('data')
+    ensure_data()
+    warm_figures(warmup_progress)
+    warmup_progress.finish()
+
+
+def warm_figures(progress=None):
+    # Wykresy bez filtrów dla wszystkich stron - pierwsze wejście na /salaries nie czeka na ich budowę
+    view = unfiltered_view()
+    if progress is not None:
+        progress.begin('figures', total=len(CHARTS))
+    for chart_figure in CHARTS.values():
+        chart_figure(view)
+        if progress is not None:
+            progress.advance()
+
+
+def start_warmup():
+    # Watcher dopiero po wczytaniu danych - dopisuje miesiące do gotowej ramki
+    def run():
+        warm_up()
+        start_watcher()
+
+    global warmup_thread
+    with background_lock:
+        if warmup_thread is None:
+            warmup_thread = warmup.run_in_background(warmup_progress, run)
+    return warmup_thread
 
 
+def start_background():
+    # Wątki nie przechodzą przez fork: po rozgrzaniu w procesie nadrzędnym (wsgi.py) worker uruchamia
+    # tylko swój watcher, w przeciwnym razie rozgrzewa się sam w tle
+    if warmup_progress.ready:
+        return start_watcher()
+    return start_warmup()
+
+
+def update_offers(new_all_offers, new_months):
+    # Tryb w pamięci: watcher dopisał wiersze nowych miesięcy - kostki budowane tylko z nich
+    state = data
+    new_rows = new_all_offers['report date'].isin(new_months).to_numpy()
+    offer_index = identity.append_months(
+        state.offer_index, new_all_offers.loc[new_rows, 'id hash'], new_all_offers.loc[new_rows, 'report date'])
+    new_offers = identity.mark_previous_seen(new_all_offers[new_rows], offer_index)
+    publish_state(build_state(
+        state.version + 1, new_all_offers, offer_index,
+        aggregates.concat_aggregates([state_aggregates(state), aggregates.build_aggregates(new_offers)])), new_months)
+
+
+def update_aggregates(ingested, new_months):
+    # Tryb strumieniowy: stream.ingest_months zwraca kostki nowych miesięcy i uzupełniony indeks ofert
+    new_aggregates, offer_index = ingested
+    state = data
+    publish_state(build_state(
+        state.version + 1, None, offer_index,
+        aggregates.concat_aggregates([state_aggregates(state), new_aggregates])), new_months)
+
+
+def publish_state(state, new_months):
+    global data
+
+    # Nowy stan zbudowany obok bieżącego (strony do końca korzystały ze starego) i podmieniony jednym przypisaniem
+    data = state
+    # Wykresy i widoki starej wersji nie trafią już do nowej - wersja jest częścią klucza cache
+    figure_cache.invalidate()
+    cached_filtered_view.cache_clear()
+    logger.info("Wczytano nowe miesiące: %s", ', '.join(f'{month:%m.%Y}' for month in new_months))
+    # Wywoływane w wątku watchera - wykresy po nowym miesiącu też budowane są w tle, a nie przez pierwszego gościa
+    warm_figures()
+
+
+def current_view(month_range, locations, selected_technologies, seniorities):
+    state = ensure_data()
+    months = report_months(state)
+    start_date, end_date = None, None
+    if month_range and month_range[0] > 0:
+        start_date = months[month_range[0]]
+    if month_range and month_range[1] < len(months) - 1:
+        end_date = months[month_range[1]]
+
+    selection = filters.normalize_selection(start_date, end_date, locations, selected_technologies, seniorities)
+    if filters.is_empty_selection(selection):
+        return unfiltered_view(state)
+    return cached_filtered_view(state, selection)
+
+
+def unfiltered_view(state=None):
+    state = state or ensure_data()
+    return {'state': state, 'offers_cube': state.offers_cube, 'latest_cube': state.latest_cube,
+            'history_cube': state.history_cube, 'latest_history_cube': state.latest_history_cube,
+            'technology_cube': state.technology_cube, 'latest_technology_cube': state.latest_technology_cube,
+            'salary_sketches': state.salary_sketches, 'company_size_sketches': state.company_size_sketches,
+            'range_sketches': state.range_sketches}
+
+
+# Przefiltrowane ramki dla ostatnio używanych kombinacji filtrów; wersja danych w kluczu (state.version),
+# więc widok zbudowany ze starego stanu w trakcie aktualizacji nie zostanie użyty dla nowego
+@lru_cache(maxsize=32)
+def cached_filtered_view(state, selection):
+    return {'state': state, **filters.filtered_view(state_aggregates(state), state.filter_indexes, selection,
+                                                    state.version)}
+
+
+def report_months(state):
+    if state is None:
+        return []
+    return sorted(state.offers_cube['report date'].unique())
+
+
+@metrics.timed('dashboard_layout_seconds', page='home')
 def layout_home():
+    state = data
+    if state is None:
+        # Strona główna nie czeka na dane - liczby pojawią się po przeładowaniu (warmup_poller)
+        date_range = unique_offers = new_offers = "…"
+    else:
+        months = report_months(state)
+        date_range = f"{months[0]:%m.%Y} - {months[-1]:%m.%Y}"
+        unique_offers = f"{identity.unique_offers(state.offer_index):,}".replace(',', ' ')
+        new_offers = f"{state.offer_churn['new'].iloc[-1]:,}".replace(',', ' ')
     return html.Div(
         [
             html.H1("Analiza ofert pracy programistów w Polsce", style={"margin-top": "2rem"}),
@@ -82,7 +282,15 @@ def layout_home():
                     html.Div(
                         [
                             html.H4("Liczba analizowanych ofert"),
-                            html.H2("18 209", style={"color": "#4e79a7"}),
+                            html.H2(unique_offers, style={"color": "#4e79a7"}),
+                        ],
+                        className="card p-3 m-2",
+                        style={"background": "#f9f9f9", "display": "inline-block", "width": "350px"}
+                    ),
+                    html.Div(
+                        [
+                            html.H4("Nowe oferty w ostatnim miesiącu"),
+                            html.H2(new_offers, style={"color": "#59a14f"}),
                         ],
                         className="card p-3 m-2",
                         style={"background": "#f9f9f9", "display": "inline-block", "width": "350px"}
@@ -90,7 +298,7 @@ def layout_home():
                     html.Div(
                         [
                             html.H4("Zakres dat"),
-                            html.H2("09.2023 - 06.2024", style={"color": "#f28e2b"}),
+                            html.H2(date_range, style={"color": "#f28e2b"}),
                         ],
                         className="card p-3 m-2",
                         style={"background": "#f9f9f9", "display": "inline-block", "width": "350px"}
@@ -118,142 +326,390 @@ def layout_home():
     )
 
 
+# Każdy wykres ma własny callback - strona od razu pokazuje szkielet, a tanie wykresy nie czekają na najwolniejszy
+CHARTS = {
+    'offers-all': lambda view: cached(
+        offers.show_all_offers, view['history_cube'], view['state'].location_colors),
+    'offers-latest': lambda view: cached(
+        offers.show_latest_offers, view['latest_history_cube'], view['state'].location_colors),
+    'offers-all-per-1000': lambda view: cached(
+        offers.show_all_offers_per_1000, view['history_cube'], view['state'].location_colors),
+    'offers-latest-per-1000': lambda view: cached(
+        offers.show_latest_offers_per_1000, view['latest_history_cube'], view['state'].location_colors),
+    'offers-cities': lambda view: cached(offers.show_cities_for_all_offers, view['history_cube']),
+    'salary-seniority': lambda view: cached(salary.show_salary_by_seniority, view['range_sketches']),
+    'salary-percentiles': lambda view: cached(salary.show_salary_percentiles_over_time, view['salary_sketches']),
+    'salary-contract-type': lambda view: cached(
+        salary.show_salary_distribution_by_contract_type, view['salary_sketches']),
+    'salary-company-size-b2b': lambda view: cached(
+        salary.show_salary_by_company_size_b2b, view['company_size_sketches']),
+    'salary-company-size-uop': lambda view: cached(
+        salary.show_salary_by_company_size_uop, view['company_size_sketches']),
+    'salary-technology': lambda view: cached(salary.show_salary_by_technology, view['salary_sketches']),
+    'salary-city': lambda view: cached(salary.show_salary_by_city, view['salary_sketches']),
+    'seniority-distribution': lambda view: cached(seniority.show_seniority_distribution, view['offers_cube']),
+    'seniority-city': lambda view: cached(seniority.show_seniority_by_city, view['offers_cube']),
+    'seniority-technology': lambda view: cached(
+        seniority.show_technology_by_seniority, view['latest_technology_cube']),
+    'seniority-trends': lambda view: cached(seniority.show_seniority_trends_over_time, view['offers_cube']),
+    'technology-distribution': lambda view: cached(
+        technologies.show_technology_distribution, view['technology_cube'], view['state'].technology_colors),
+    'technology-treemap-all': lambda view: cached(
+        technologies.show_popular_technologies_treemap_all_offers, view['technology_cube']),
+    'technology-treemap-latest': lambda view: cached(
+        technologies.show_popular_technologies_treemap_latest, view['latest_technology_cube']),
+    'technology-trends': lambda view: cached(
+        technologies.show_technology_trends_over_time, view['technology_cube'], view['state'].technology_colors),
+    'contracts-city': lambda view: cached(contracts.show_contract_types_by_city, view['offers_cube']),
+    'contracts-remote': lambda view: cached(contracts.show_remote_contract_types, view['offers_cube']),
+    # Historia ofert liczona na pełnym indeksie - bez filtrów
+    'churn-monthly': lambda view: cached(churn.show_offer_churn, view['state'].offer_churn),
+    'churn-lifetimes': lambda view: cached(churn.show_offer_lifetimes, view['state'].offer_lifetimes,
+                                           pipeline.report_period(view['state'].offer_churn['report date'])),
+}
+
+
+def chart(name):
+    return dcc.Loading(dcc.Graph(id={"type": "chart", "name": name}), type="circle")
+
+
+def layout_warming_up():
+    progress = warmup_progress.stats()
+    if progress['error']:
+        status = f"Nie udało się przygotować danych: {progress['error']}"
+    elif progress['stage'] == 'figures':
+        status = f"Budowa wykresów: {progress['done']} z {progress['total']}"
+    else:
+        status = "Wczytywanie danych…"
+    return html.Div([
+        html.H2("Trwa przygotowywanie danych"),
+        html.P("Strona odświeży się sama, gdy wykresy będą gotowe."),
+        html.P(status, style={"color": "gray"}),
+    ], style={"margin-left": "18rem", "padding": "2rem 1rem"})
+
+
+@metrics.timed('dashboard_layout_seconds', page='offers')
 def layout_offers():
     return html.Div([
         html.H2("Porównanie ofert względem miasta - praca stacjonarna"),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=offers.show_all_offers(all_offers, location_colors)), width=6),
-            dbc.Col(dcc.Graph(figure=offers.show_latest_offers(latest, location_colors)), width=6),
+            dbc.Col(chart('offers-all'), width=6),
+            dbc.Col(chart('offers-latest'), width=6),
         ]),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=offers.show_all_offers_per_1000(all_offers, location_colors)), width=6),
-            dbc.Col(dcc.Graph(figure=offers.show_latest_offers_per_1000(latest, location_colors)), width=6),
+            dbc.Col(chart('offers-all-per-1000'), width=6),
+            dbc.Col(chart('offers-latest-per-1000'), width=6),
         ]),
-        dbc.Row([dcc.Graph(figure=offers.show_cities_for_all_offers(all_offers))], style={"margin-top": "2rem"}),
+        dbc.Row([
+            chart('offers-cities')
+        ], style={"margin-top": "2rem"}),
     ], style={"margin-left": "18rem", "padding": "2rem 1rem"})
 
 
+@metrics.timed('dashboard_layout_seconds', page='salaries')
 def layout_salaries():
     return html.Div([
         html.H2("Porównanie wynagrodzeń"),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=salary.show_salary_by_seniority(all_offers)), width=12),
+            dbc.Col(chart('salary-seniority'), width=12),
         ]),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=salary.show_salary_distribution_by_contract_type(all_offers)), width=12),
+            dbc.Col(chart('salary-percentiles'), width=12),
+        ], style={"margin-top": "2rem"}),
+        dbc.Row([
+            dbc.Col(chart('salary-contract-type'), width=12),
+        ], style={"margin-top": "2rem"}),
+        dbc.Row([
+            chart('salary-company-size-b2b')
+        ], style={"margin-top": "2rem"}),
+        dbc.Row([
+            chart('salary-company-size-uop')
+        ], style={"margin-top": "2rem"}),
+        dbc.Row([
+            chart('salary-technology')
+        ], style={"margin-top": "2rem"}),
+        dbc.Row([
+            chart('salary-city')
         ], style={"margin-top": "2rem"}),
-        dbc.Row([dcc.Graph(figure=salary.show_salary_by_company_size_b2b(all_offers))], style={"margin-top": "2rem"}),
-        dbc.Row([dcc.Graph(figure=salary.show_salary_by_company_size_uop(all_offers))], style={"margin-top": "2rem"}),
-        dbc.Row([dcc.Graph(figure=salary.show_salary_by_technology(all_offers, latest))], style={"margin-top": "2rem"}),
-        dbc.Row([dcc.Graph(figure=salary.show_salary_by_city(all_offers, latest))], style={"margin-top": "2rem"}),
     ], style={"margin-left": "18rem", "padding": "2rem 1rem"})
 
 
+@metrics.timed('dashboard_layout_seconds', page='seniority')
 def layout_seniority():
     return html.Div([
         html.H2("Porównanie poziomu doświadczenia"),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=seniority.show_seniority_distribution(all_offers)), width=12),
+            dbc.Col(chart('seniority-distribution'), width=12),
         ]),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=seniority.show_seniority_by_city(all_offers)), width=12),
+            dbc.Col(chart('seniority-city'), width=12),
         ], style={"margin-top": "2rem"}),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=seniority.show_technology_by_seniority(latest)), width=12),
+            dbc.Col(chart('seniority-technology'), width=12),
         ], style={"margin-top": "2rem"}),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=seniority.show_seniority_trends_over_time(all_offers)), width=12),
+            dbc.Col(chart('seniority-trends'), width=12),
         ], style={"margin-top": "2rem"}),
     ], style={"margin-left": "18rem", "padding": "2rem 1rem"})
 
 
+@metrics.timed('dashboard_layout_seconds', page='technologies')
 def layout_technologies():
     return html.Div([
         html.H2("Porównanie technologii i typów kontraktów"),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=technologies.show_technology_distribution(all_offers, technology_colors)),
-                    width=12),
+            dbc.Col(chart('technology-distribution'), width=12),
         ]),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=technologies.show_popular_technologies_treemap_all_offers(all_offers)), width=12),
+            dbc.Col(chart('technology-treemap-all'), width=12),
         ], style={"margin-top": "2rem"}),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=technologies.show_popular_technologies_treemap_latest(latest)), width=12),
+            dbc.Col(chart('technology-treemap-latest'), width=12),
         ], style={"margin-top": "2rem"}),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=technologies.show_technology_trends_over_time(all_offers, technology_colors)),
-                    width=12),
+            dbc.Col(chart('technology-trends'), width=12),
         ], style={"margin-top": "2rem"}),
     ], style={"margin-left": "18rem", "padding": "2rem 1rem"})
 
 
+@metrics.timed('dashboard_layout_seconds', page='contracts')
 def layout_contracts():
     return html.Div([
         html.H2("Preferowane typy kontraktów"),
         dbc.Row([
-            dbc.Col(dcc.Graph(figure=contracts.show_contract_types_by_city(all_offers)), width=12),
+            dbc.Col(chart('contracts-city'), width=12),
+        ], style={"margin-top": "2rem"}),
+        dbc.Row([
+            chart('contracts-remote')
+        ], style={"margin-top": "2rem"}),
+    ], style={"margin-left": "18rem", "padding": "2rem 1rem"})
+
+
+@metrics.timed('dashboard_layout_seconds', page='churn')
+def layout_churn():
+    return html.Div([
+        html.H2("Rotacja ofert"),
+        html.P("Oferty rozpoznawane po id: nowe, przeniesione z poprzedniego miesiąca, powracające po przerwie "
+               "i usunięte. Wykresy obejmują cały zbiór, bez filtrów."),
+        dbc.Row([
+            dbc.Col(chart('churn-monthly'), width=12),
+        ]),
+        dbc.Row([
+            chart('churn-lifetimes')
         ], style={"margin-top": "2rem"}),
-        dbc.Row([dcc.Graph(figure=contracts.show_remote_contract_types(all_offers))], style={"margin-top": "2rem"}),
     ], style={"margin-left": "18rem", "padding": "2rem 1rem"})
 
 
 # Aplikacja Dash
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 
-sidebar = html.Div(
-    [
-        html.P("Nawigacja", className="lead", style={"color": "white"}),
-        html.Hr(),
-        dbc.Nav(
-            [
-                dbc.NavLink("Wprowadzenie", href="/", active="exact"),
-                dbc.NavLink("Oferty per miasto", href="/offers", active="exact"),
-                dbc.NavLink("Stosowane technologie", href="/tech_stack", active="exact"),
-                dbc.NavLink("Preferowane typy kontraktów", href="/contracts", active="exact"),
-                dbc.NavLink("Porównanie wynagrodzeń", href="/salaries", active="exact"),
-                dbc.NavLink("Porównanie poziomu doświadczenia", href="/seniority", active="exact"),
-            ],
-            vertical=True,
-            pills=True
-        ),
-    ],
-    style={
-        "position": "fixed",
-        "top": 0,
-        "left": 0,
-        "bottom": 0,
-        "width": "15rem",
-        "padding": "2rem 1rem",
-        "background-color": "#22223b",
-        "color": "white",
-    },
-)
 
-app.layout = html.Div([
-    dcc.Location(id="url"),
-    sidebar,
-    html.Div(id="page-content")
-])
+# Strony w kolejności menu - używane też przez statyczny eksport (export/export.py)
+PAGES = {
+    "/": ("Wprowadzenie", layout_home),
+    "/offers": ("Oferty per miasto", layout_offers),
+    "/tech_stack": ("Stosowane technologie", layout_technologies),
+    "/contracts": ("Preferowane typy kontraktów", layout_contracts),
+    "/salaries": ("Porównanie wynagrodzeń", layout_salaries),
+    "/seniority": ("Porównanie poziomu doświadczenia", layout_seniority),
+    "/churn": ("Rotacja ofert", layout_churn),
+}
 
+SIDEBAR_STYLE = {
+    "position": "fixed",
+    "top": 0,
+    "left": 0,
+    "bottom": 0,
+    "width": "15rem",
+    "padding": "2rem 1rem",
+    "background-color": "#22223b",
+    "color": "white",
+    "overflow-y": "auto",
+}
 
+
+def build_sidebar():
+    state = data
+    months = report_months(state)
+    # Przed wczytaniem danych filtry są nieaktywne, ale obecne - callback wykresów odwołuje się do ich id
+    loaded = len(months) > 0
+    return html.Div(
+        [
+            html.P("Nawigacja", className="lead", style={"color": "white"}),
+            html.Hr(),
+            dbc.Nav(
+                [dbc.NavLink(title, href=pathname, active="exact") for pathname, (title, _) in PAGES.items()],
+                vertical=True,
+                pills=True
+            ),
+            html.Hr(),
+            html.P("Filtry", className="lead", style={"color": "white"}),
+            html.Label("Zakres dat"),
+            dcc.RangeSlider(
+                id="filter-months",
+                min=0,
+                max=max(len(months) - 1, 0),
+                step=1,
+                value=[0, max(len(months) - 1, 0)],
+                marks={i: f"{month:%m.%y}" for i, month in enumerate(months) if i % 3 == 0 or i == len(months) - 1},
+                disabled=not loaded,
+            ),
+            dcc.Dropdown(
+                id="filter-locations",
+                options=sorted(state.offers_cube["location"].dropna().unique()) if loaded else [],
+                disabled=not loaded,
+                multi=True,
+                placeholder="Wszystkie miasta",
+                style={"color": "black", "margin-top": "1rem"},
+            ),
+            dcc.Dropdown(
+                id="filter-technologies",
+                options=sorted(state.technology_cube["technology"].dropna().unique()) if loaded else [],
+                disabled=not loaded,
+                multi=True,
+                placeholder="Wszystkie technologie",
+                style={"color": "black", "margin-top": "0.5rem"},
+            ),
+            dcc.Dropdown(
+                id="filter-seniorities",
+                options=list(state.offers_cube["seniority"].cat.categories) if loaded else [],
+                disabled=not loaded,
+                multi=True,
+                placeholder="Każde doświadczenie",
+                style={"color": "black", "margin-top": "0.5rem"},
+            ),
+        ],
+        style=SIDEBAR_STYLE,
+    )
+
+
+@app.server.after_request
+def compress_response(response):
+    return payload.compress_response(response, flask.request)
+
+
+@app.server.before_request
+def ensure_background():
+    # Serwer WSGI bez hooka post_fork (albo gunicorn bez gunicorn.conf.py) - rozgrzewanie i watcher
+    # startują przy pierwszym żądaniu workera
+    if watcher_thread is None:
+        start_background()
+
+
+@app.server.route("/ready")
+def ready():
+    # Dla load balancera: 200 dopiero po wczytaniu danych i zbudowaniu wykresów wszystkich stron
+    progress = warmup_progress.stats()
+    return progress, 200 if progress['ready'] else 503
+
+
+@app.server.route("/cache-stats")
+def cache_stats():
+    return figure_cache.stats()
+
+
+@metrics.register_collector
+def cache_metrics():
+    state = data
+    figures = figure_cache.stats()
+    views = cached_filtered_view.cache_info()
+    return [
+        ('dashboard_cache_requests_total', 'counter', "Odwołania do cache wykresów i przefiltrowanych widoków", [
+            ({'cache': 'figures', 'result': 'hit'}, figures['hits']),
+            ({'cache': 'figures', 'result': 'miss'}, figures['misses']),
+            ({'cache': 'views', 'result': 'hit'}, views.hits),
+            ({'cache': 'views', 'result': 'miss'}, views.misses),
+        ]),
+        ('dashboard_cache_entries', 'gauge', "Liczba wpisów w cache", [
+            ({'cache': 'figures'}, figures['size']),
+            ({'cache': 'views'}, views.currsize),
+        ]),
+        ('dashboard_aggregate_rows', 'gauge', "Liczba komórek kostek i szkiców",
+         [({'aggregate': name}, len(getattr(state, name)) if state is not None else 0)
+          for name in aggregates.DIMENSIONS]),
+        ('dashboard_unique_offers', 'gauge', "Liczba unikalnych ofert (po id)",
+         [({}, identity.unique_offers(state.offer_index) if state is not None else 0)]),
+        ('dashboard_ready', 'gauge', "1 po zakończeniu rozgrzewania (dane i wykresy wszystkich stron)",
+         [({}, int(warmup_progress.ready))]),
+    ]
+
+
+@app.server.route("/metrics")
+def metrics_endpoint():
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+def serve_layout():
+    # Funkcja zamiast stałego layoutu - zakres dat i opcje filtrów obejmują miesiące dodane po starcie
+    return html.Div([
+        dcc.Location(id="url"),
+        build_sidebar(),
+        html.Div(id="page-content"),
+        # Odpytywanie /ready w trakcie rozgrzewania; po jego końcu przeładowanie z danymi i filtrami
+        dcc.Interval(id="warmup-poller", interval=2000, disabled=warmup_progress.ready),
+    ])
+
+
+app.layout = serve_layout
+
+
+@app.callback(Output("page-content", "children"), Input("url", "pathname"))
+@metrics.timed('dashboard_callback_seconds', callback='display_page')
+def display_page(pathname):
+    _, layout = PAGES.get(pathname, PAGES["/"])
+    if not warmup_progress.ready and layout is not layout_home:
+        return layout_warming_up()
+    return layout()
+
+
+app.clientside_callback(
+    """
+    function(n_intervals) {
+        fetch("/ready").then(function(response) {
+            if (response.ok) {
+                window.location.reload();
+            }
+        });
+        return window.dash_clientside.no_update;
+    }
+    """,
+    Output("warmup-poller", "disabled"),
+    Input("warmup-poller", "n_intervals"),
+    prevent_initial_call=True,
+)
+
+
+# Zmiana filtrów odświeża tylko wykresy, szkielet strony zostaje na miejscu
 @app.callback(
-    Output("page-content", "children"),
-    Input("url", "pathname")
+    Output({"type": "chart", "name": MATCH}, "figure"),
+    Input({"type": "chart", "name": MATCH}, "id"),
+    Input("filter-months", "value"),
+    Input("filter-locations", "value"),
+    Input("filter-technologies", "value"),
+    Input("filter-seniorities", "value"),
 )
-def display_page(pathname):
-    if pathname == "/offers":
-        return layout_offers()
-    elif pathname == "/tech_stack":
-        return layout_technologies()
-    elif pathname == "/salaries":
-        return layout_salaries()
-    elif pathname == "/seniority":
-        return layout_seniority()
-    elif pathname == "/contracts":
-        return layout_contracts()
-    else:
-        return layout_home()
+@metrics.timed('dashboard_callback_seconds', callback='display_chart')
+def display_chart(chart_id, month_range, locations, selected_technologies, seniorities):
+    return CHARTS[chart_id["name"]](current_view(month_range, locations, selected_technologies, seniorities))
+
+
+def start_watcher():
+    global watcher_thread
+    with background_lock:
+        if watcher_thread is not None:
+            return watcher_thread
+        if STREAMING:
+            # Znane miesiące z kostki ofert; bez snapshotu - ten zawiera pełne oferty
+            watcher_thread = watcher.watch_dataset(
+                lambda: data.offers_cube, update_aggregates, store=None,
+                ingest=lambda _, new_files: stream.ingest_months(new_files, data.offer_index))
+        else:
+            watcher_thread = watcher.watch_dataset(lambda: data.all_offers, update_offers)
+    return watcher_thread
 
 
 if __name__ == "__main__":
+    # Serwer deweloperski; produkcyjnie przez gunicorn (gunicorn.conf.py, wsgi.py)
+    logging.basicConfig(level=logging.INFO)
+    start_warmup()
     app.run(debug=True)
@@ -1,46 +1,33 @@
-import plotly.express as px
-
-wspolrzedne_miast = {
-    'Warszawa': (52.2297, 21.0122),
-    'Kraków': (50.0647, 19.9450),
-    'Wrocław': (51.1079, 17.0385),
-    'Poznań': (52.4064, 16.9252),
-    'Gdańsk': (54.3520, 18.6466),
-    'Katowice': (50.2649, 19.0238),
-    'Łódź': (51.7592, 19.4560),
-    'Lublin': (51.2465, 22.5684),
-    'Szczecin': (53.4285, 14.5528),
-    'Bydgoszcz': (53.1235, 18.0084),
-    'Białystok': (53.1325, 23.1688),
-    'Rzeszów': (50.0412, 21.9991),
-    'Toruń': (53.0138, 18.5984)
-}
-
-# Populacja miast w tysiącach mieszkańców (dane przybliżone)
-populacja_miast = {
-    'Warszawa': 1862,
-    'Kraków': 808,
-    'Wrocław': 674,
-    'Poznań': 537,
-    'Gdańsk': 488,
-    'Katowice': 286,
-    'Łódź': 649,
-    'Lublin': 329,
-    'Szczecin': 388,
-    'Bydgoszcz': 325,
-    'Białystok': 291,
-    'Rzeszów': 197,
-    'Toruń': 195
-}
-
-def show_all_offers(all, location_colors, title="Liczba ofert per miasto od września 2023 do czerwca 2024", updateXaxes=True):
-    filtered_df = all[all["location"] != "Remote"]
-
-    location_counts = filtered_df["location"].value_counts().reset_index()
+from cube import cube
+from locations import locations
+from pipeline import pipeline
+
+
+def city_counts(history_cube):
+    # Unikalne oferty per miejscowość z tabeli wymiaru lokalizacji - warianty zapisu trafiają do jednej nazwy,
+    # a wartości spoza tabeli (np. Remote) odpadają
+    unique_cube = cube.unique_offers(history_cube)
+    per_location = locations.join_locations(cube.rollup(unique_cube, 'location').reset_index(),
+                                            columns=['name', 'population', 'lat', 'lon'])
+    per_location = per_location[per_location['population'] > 0]
+    cities = per_location.groupby('location name', observed=True, sort=False).agg(
+        count=('count', 'sum'), population=('population', 'first'), lat=('lat', 'first'), lon=('lon', 'first'))
+    cities = cities[cities['count'] > 0].sort_values('count', ascending=False, kind='stable')
+    # Nazwy jako zwykłe napisy, jak w cube.counts - plotly.express nie dostaje pustych kategorii
+    cities.index = cities.index.astype(object)
+    return cities.reset_index()
+
+
+def show_all_offers(history_cube, location_colors, title="Liczba ofert per miasto", updateXaxes=True):
+    import plotly.express as px
+
+    # Oferta widoczna w kilku miesiącach liczona raz, warianty zapisu miasta pod jedną nazwą z tabeli wymiaru
+    # (praca zdalna i miejscowości spoza tabeli odpadają)
+    location_counts = city_counts(history_cube)[["location name", "count"]]
     location_counts.columns = ["location", "count"]
 
     fig = px.bar(location_counts, y="location", x="count",
-                 title=title,
+                 title=pipeline.titled(title, history_cube['report date']),
                  labels={"location": "Miasto", "count": "Liczba ofert"},
                  width=800,
                  color="location",
@@ -63,23 +50,20 @@ def show_all_offers(all, location_colors, title="Liczba ofert per miasto od wrze
     return fig
 
 
-def show_latest_offers(latest, location_colors):
-    fig = show_all_offers(latest, location_colors, title="Liczba ofert per miasto w dniu 1 czerwca 2024", updateXaxes=False)
+def show_latest_offers(latest_history_cube, location_colors):
+    fig = show_all_offers(latest_history_cube, location_colors, updateXaxes=False)
     # fig.write_html("offers/latest_offers.html")
     return fig
 
-def show_all_offers_per_1000(all, location_colors, title="Liczba ofert na 1000 mieszkańców od września 2023 do czerwca 2024"):
-    filtered_df = all[all["location"] != "Remote"]
+def show_all_offers_per_1000(history_cube, location_colors, title="Liczba ofert na 1000 mieszkańców"):
+    import plotly.express as px
 
-    location_counts = filtered_df["location"].value_counts().reset_index()
-    location_counts.columns = ["location", "count"]
-
-    location_counts["populacja"] = location_counts["location"].map(lambda x: populacja_miast.get(x, 0))
-    location_counts = location_counts[location_counts["populacja"] > 0]
+    location_counts = city_counts(history_cube)[["location name", "count", "population"]]
+    location_counts.columns = ["location", "count", "populacja"]
     location_counts["oferty_na_1000"] = location_counts["count"] / location_counts["populacja"]
 
     fig = px.bar(location_counts, y="location", x="oferty_na_1000",
-                 title=title,
+                 title=pipeline.titled(title, history_cube['report date']),
                  labels={"location": "Miasto", "oferty_na_1000": "Liczba ofert na 1000 mieszkańców"},
                  width=800,
                  color="location",
@@ -94,25 +78,21 @@ def show_all_offers_per_1000(all, location_colors, title="Liczba ofert na 1000 m
     return fig
 
 
-def show_latest_offers_per_1000(latest, location_colors):
-    fig = show_all_offers_per_1000(latest, location_colors, title="Liczba ofert na 1000 mieszkańców w dniu 1 czerwca 2024")
+def show_latest_offers_per_1000(latest_history_cube, location_colors):
+    fig = show_all_offers_per_1000(latest_history_cube, location_colors)
     # fig.write_html("offers/latest_offers.html")
     return fig
 
 
-def show_cities_for_all_offers(all,
-                               title="Liczba ofert pracy dla programistów na 1000 mieszkańców od września 2023 do czerwca 2024"):
-    miasta_all = all[all['location'] != 'Remote']['location'].value_counts().reset_index()
-    miasta_all.columns = ['miasto', 'liczba_ofert']
+def show_cities_for_all_offers(history_cube, title="Liczba ofert pracy dla programistów na 1000 mieszkańców"):
+    import plotly.express as px
 
-    # Dodaj dane o populacji i oblicz liczbę ofert na 1000 mieszkańców
-    miasta_all['populacja'] = miasta_all['miasto'].map(lambda x: populacja_miast.get(x, 0))
-    miasta_all = miasta_all[miasta_all['populacja'] > 0]
-    miasta_all['oferty_na_1000'] = miasta_all['liczba_ofert'] / miasta_all['populacja'] * 1000
+    miasta = city_counts(history_cube)
+    miasta.columns = ['miasto', 'liczba_ofert', 'populacja', 'lat', 'lon']
 
-    miasta_all['lat'] = miasta_all['miasto'].map(lambda x: wspolrzedne_miast[x][0] if x in wspolrzedne_miast else None)
-    miasta_all['lon'] = miasta_all['miasto'].map(lambda x: wspolrzedne_miast[x][1] if x in wspolrzedne_miast else None)
-    miasta = miasta_all.dropna(subset=['lat', 'lon'])
+    # Oblicz liczbę ofert na 1000 mieszkańców
+    miasta['oferty_na_1000'] = miasta['liczba_ofert'] / miasta['populacja'] * 1000
+    miasta = miasta.dropna(subset=['lat', 'lon'])
 
     fig = px.scatter_mapbox(
         miasta,
@@ -132,7 +112,7 @@ def show_cities_for_all_offers(all,
         size_max=40,
         zoom=5,
         center={"lat": 52.1, "lon": 19.4},
-        title=title,
+        title=pipeline.titled(title, history_cube['report date']),
         width=1200
     )
     fig.update_layout(
@@ -144,8 +124,7 @@ def show_cities_for_all_offers(all,
     return fig
 
 
-def show_cities_for_latest_offers(latest):
-    fig = show_cities_for_all_offers(latest,
-                                     title="Liczba ofert pracy dla programistów na 1000 mieszkańców w dniu 1 czerwca 2024")
+def show_cities_for_latest_offers(latest_history_cube):
+    fig = show_cities_for_all_offers(latest_history_cube)
     # fig.write_html("offers/cities_for_latest_offers.html")
     return fig
@@ -0,0 +1,131 @@
+import base64
+import gzip
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    # Bez orjson ta sama ścieżka na standardowym json - wolniej, ale wynik jest identyczny
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Atrybuty śladów typu data_array - plotly.js (>= 2.28) przyjmuje w nich tablice zakodowane w base64
+TYPED_ARRAY_KEYS = {'x', 'y', 'z', 'values', 'customdata', 'lat', 'lon'}
+# Krótkie tablice zostają listami - nagłówek {dtype, bdata} byłby dłuższy od liczb
+TYPED_ARRAY_MIN_LENGTH = 16
+# Najmniejszy typ całkowity, w którym mieszczą się wartości (kody dtype z plotly.js)
+INTEGER_DTYPES = [('u1', 'uint8'), ('i1', 'int8'), ('u2', 'uint16'), ('i2', 'int16'), ('u4', 'uint32'),
+                  ('i4', 'int32')]
+
+COMPRESSED_MIMETYPES = {'application/json', 'text/html', 'text/css', 'application/javascript', 'text/javascript',
+                        'text/plain'}
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Skompresowane pliki Dash (np. plotly.min.js) - niezmienne dla danej ścieżki i ETag, więc kompresowane raz
+STATIC_CACHE_SIZE = 32
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def figure_json(fig):
+    # JSON wykresu z tablicami liczb w postaci typed array (base64) - mniej bajtów i brak list liczb,
+    # które Dash przy każdej odpowiedzi przechodzi element po elemencie
+    figure = loads(fig.to_json())
+    for trace in figure.get('data', []):
+        encode_arrays(trace)
+    return dumps(figure)
+
+
+def encode_arrays(trace):
+    for key, value in trace.items():
+        if key in TYPED_ARRAY_KEYS:
+            trace[key] = typed_array(value)
+        elif isinstance(value, dict):
+            encode_arrays(value)
+
+
+def typed_array(values):
+    if not isinstance(values, list) or len(values) < TYPED_ARRAY_MIN_LENGTH:
+        return values
+    # Tylko jednowymiarowe listy liczb (bez None i wartości logicznych) - daty i napisy zostają bez zmian
+    if not all(type(value) in (int, float) for value in values):
+        return values
+    array = np.asarray(values, dtype='float64')
+    if not np.all(np.isfinite(array)):
+        return values
+
+    dtype = 'f8', 'float64'
+    if np.array_equal(array, np.round(array)):
+        low, high = array.min(), array.max()
+        for code, name in INTEGER_DTYPES:
+            if np.iinfo(name).min <= low and high <= np.iinfo(name).max:
+                dtype = code, name
+                break
+    elif np.array_equal(array.astype('float32'), array):
+        dtype = 'f4', 'float32'
+    return {'dtype': dtype[0], 'bdata': base64.b64encode(array.astype(dtype[1]).tobytes()).decode('ascii')}
+
+
+def accepted_encoding(accept_encoding):
+    encodings = {part.split(';')[0].strip() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in encodings:
+        return 'br'
+    if 'gzip' in encodings:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+static_cache = OrderedDict()
+static_lock = threading.Lock()
+
+
+def compress_response(response, request):
+    # Flask after_request: kompresja odpowiedzi callbacków i plików Dash, jeśli przeglądarka to obsługuje
+    encoding = accepted_encoding(request.headers.get('Accept-Encoding', ''))
+    if (encoding is None or response.direct_passthrough or response.status_code != 200
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSED_MIMETYPES):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if response.cache_control.max_age is None and 'ETag' not in response.headers:
+        compressed = compress(data, encoding)
+    else:
+        key = request.path, response.headers.get('ETag'), encoding
+        with static_lock:
+            compressed = static_cache.get(key)
+        if compressed is None:
+            compressed = compress(data, encoding)
+            with static_lock:
+                static_cache[key] = compressed
+                while len(static_cache) > STATIC_CACHE_SIZE:
+                    static_cache.popitem(last=False)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
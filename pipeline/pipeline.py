@@ -0,0 +1,207 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from glob import glob
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from metrics import metrics
+
+# Podbić przy każdej zmianie w prepare_offers lub schemacie - unieważnia zapisane snapshoty
+PIPELINE_VERSION = 4
+
+DATASET_PATTERN = '*_soft_eng_jobs_pol.csv'
+REPORT_DATE_REGEX = re.compile(r'(\d{4})(\d{2})_soft_eng_jobs_pol\.csv$')
+
+# Stały schemat plików miesięcznych - bez zgadywania typów dla każdego pliku osobno
+OFFER_DTYPES = {
+    'id': 'object',
+    'company': 'category',
+    'company size': 'float32',
+    'location': 'category',
+    'technology': 'category',
+    'seniority': 'category',
+    'salary employment min': 'float32',
+    'salary employment max': 'float32',
+    'salary b2b min': 'float32',
+    'salary b2b max': 'float32',
+}
+
+# Słowniki wymiarów wyliczanych w prepare_offers; seniority i company size są uporządkowane
+SENIORITY_LEVELS = ['junior', 'mid', 'senior', 'expert']
+CONTRACT_TYPES = ['b2b', 'both', 'employment', 'none']
+REMOTE_VALUES = ['Non Remote', 'Remote']
+
+# Ogłoszenie może wymieniać kilka technologii, np. "Java, Kotlin"; "/" nie jest separatorem (C/C++)
+TECHNOLOGY_SEPARATOR = re.compile(r'\s*[,;|]\s*')
+
+# Dopełniacz nazw miesięcy do tytułów wykresów ("od września 2023 do lipca 2024")
+MONTHS_GENITIVE = ['stycznia', 'lutego', 'marca', 'kwietnia', 'maja', 'czerwca', 'lipca', 'sierpnia', 'września',
+                   'października', 'listopada', 'grudnia']
+
+metrics.histogram('dashboard_dataset_load_seconds', "Czas wczytania przygotowanego zbioru ofert")
+metrics.histogram('dashboard_prepare_step_seconds', "Czas kroków prepare_offers")
+
+
+def find_dataset_files(dataset_dir='dataset'):
+    files = {}
+    for path in sorted(glob(os.path.join(dataset_dir, DATASET_PATTERN))):
+        report_date = parse_report_date(path)
+        if report_date is not None:
+            files[report_date] = path
+    return files
+
+
+def parse_report_date(path):
+    match = REPORT_DATE_REGEX.search(os.path.basename(path))
+    if match is None:
+        return None
+    return pd.Timestamp(year=int(match.group(1)), month=int(match.group(2)), day=1)
+
+
+def read_month(path, report_date):
+    try:
+        df = pd.read_csv(path, dtype=OFFER_DTYPES, usecols=list(OFFER_DTYPES))
+    except pd.errors.EmptyDataError:
+        # Pusty plik (bez nagłówka) to miesiąc bez ofert, tak jak plik z samym nagłówkiem
+        df = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in OFFER_DTYPES.items()})
+    df['report date'] = report_date
+    return df
+
+
+def load_offers(dataset_dir='dataset', max_workers=None):
+    files = find_dataset_files(dataset_dir)
+    if not files:
+        raise FileNotFoundError(f"Brak plików {DATASET_PATTERN} w katalogu {dataset_dir}")
+
+    # Parser CSV w pandas zwalnia GIL, więc wątki skalują się z liczbą rdzeni bez kopiowania ramek między procesami
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        dfs = list(executor.map(read_month, files.values(), files.keys()))
+
+    return concat_months(dfs)
+
+
+def append_offers(all_offers, new_offers):
+    # Płytkie kopie - ujednolicenie kategorii nie może modyfikować ramki, z której właśnie czyta aplikacja
+    return concat_months([all_offers.copy(deep=False), new_offers.copy(deep=False)])
+
+
+def concat_months(dfs):
+    # Wspólny słownik kategorii, żeby pd.concat nie zamienił kolumn z powrotem na object
+    for column, dtype in dfs[0].dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        categories = union_categoricals([df[column] for df in dfs], ignore_order=True).categories
+        categories = sort_categories(column, categories)
+        for df in dfs:
+            df[column] = df[column].cat.set_categories(categories, ordered=dtype.ordered)
+    return pd.concat(dfs, ignore_index=True)
+
+
+def sort_categories(column, categories):
+    if column == 'seniority':
+        return sorted(categories, key=lambda level: (
+            SENIORITY_LEVELS.index(level) if level in SENIORITY_LEVELS else len(SENIORITY_LEVELS), level))
+    if column == 'company size':
+        return sorted(categories, key=lambda bucket: float(bucket.rstrip('+')))
+    return sorted(categories)
+
+
+def prepare_offers(all_offers):
+    with metrics.timer('dashboard_prepare_step_seconds', step='salary mean'):
+        employment_mean = (all_offers['salary employment min'] * 0.5 + all_offers['salary employment max'] * 0.5).round()
+        b2b_mean = (all_offers['salary b2b min'] * 0.5 + all_offers['salary b2b max'] * 0.5).round()
+
+    # Typ kontraktu wyznaczany na podstawie dostępnych widełek (kolejność warunków jak w pierwotnej wersji)
+    with metrics.timer('dashboard_prepare_step_seconds', step='contract type'):
+        has_employment = employment_mean.notna().to_numpy()
+        has_b2b = b2b_mean.notna().to_numpy()
+        contract_type = pd.Categorical.from_codes(
+            np.select([has_employment & has_b2b, ~has_employment, ~has_b2b], [1, 0, 2], default=3),
+            categories=CONTRACT_TYPES
+        )
+
+    # Wielkość firmy ograniczona do 10000 i zapisana jako uporządkowany przedział, np. "1000+"
+    with metrics.timer('dashboard_prepare_step_seconds', step='company size'):
+        company_size = all_offers['company size'].clip(upper=10000).round().to_numpy(dtype='float64')
+        missing_size = np.isnan(company_size)
+        size_buckets = np.unique(company_size[~missing_size])
+        company_size = pd.Categorical.from_codes(
+            np.where(missing_size, -1, np.searchsorted(size_buckets, company_size)),
+            categories=[f"{round(bucket)}+" for bucket in size_buckets],
+            ordered=True
+        )
+
+    with metrics.timer('dashboard_prepare_step_seconds', step='seniority'):
+        seniority = all_offers['seniority'].astype('category')
+        seniority = seniority.cat.set_categories(sort_categories('seniority', seniority.cat.categories), ordered=True)
+
+    # Pole technologii jako kategoria (cała lista z ogłoszenia) i pierwsza wymieniona technologia -
+    # liczone na słowniku kategorii, nie na wierszach
+    with metrics.timer('dashboard_prepare_step_seconds', step='technology'):
+        technologies = all_offers['technology'].astype('category')
+        technologies = technologies.cat.set_categories(sorted(technologies.cat.categories))
+        primary = [split_technologies(value)[0] for value in technologies.cat.categories]
+        primary_names = sorted(set(primary))
+        # Kod -1 (brak technologii) trafia na dopisane -1
+        primary_codes = np.append(np.searchsorted(primary_names, primary), -1)
+        technology = pd.Categorical.from_codes(primary_codes[technologies.cat.codes.to_numpy()],
+                                               categories=primary_names)
+
+    with metrics.timer('dashboard_prepare_step_seconds', step='is remote'):
+        is_remote = pd.Categorical.from_codes(
+            (all_offers['location'] == 'Remote').to_numpy().astype('int8'),
+            categories=REMOTE_VALUES
+        )
+
+    derived = {
+        'company size': company_size,
+        'seniority': seniority,
+        'technology': technology,
+        'technologies': technologies,
+        'salary employment mean': employment_mean,
+        'salary b2b mean': b2b_mean,
+        'contract type': contract_type,
+        'is remote': is_remote,
+    }
+    with metrics.timer('dashboard_prepare_step_seconds', step='id hash'):
+        derived['id hash'] = hash_ids(all_offers['id'])
+    return all_offers.assign(**derived)
+
+
+@lru_cache(maxsize=None)
+def split_technologies(value):
+    # Kolejność z ogłoszenia, bez powtórzeń; wywoływane raz na kategorię
+    return tuple(dict.fromkeys(part for part in TECHNOLOGY_SEPARATOR.split(value.strip()) if part)) or (value,)
+
+
+def hash_ids(ids):
+    # 64-bitowy skrót id (stały klucz, więc ten sam między procesami i uruchomieniami) - 8 bajtów zamiast napisu
+    return pd.util.hash_array(np.asarray(ids, dtype=object))
+
+
+def latest_offers(all_offers):
+    return all_offers[all_offers['report date'] == all_offers['report date'].max()]
+
+
+def report_period(report_dates):
+    # Zakres miesięcy widoku, tak jak na kartach strony głównej - z danych, a nie wpisany na stałe
+    if len(report_dates) == 0:
+        return ''
+    start, end = pd.Timestamp(report_dates.min()), pd.Timestamp(report_dates.max())
+    if start == end:
+        return f"w dniu {end.day} {MONTHS_GENITIVE[end.month - 1]} {end.year}"
+    return f"od {MONTHS_GENITIVE[start.month - 1]} {start.year} do {MONTHS_GENITIVE[end.month - 1]} {end.year}"
+
+
+def titled(title, report_dates):
+    return f"{title} {report_period(report_dates)}".rstrip()
+
+
+def decategorize(frame):
+    # Małe ramki zagregowane przekazywane do plotly.express - bez pustych kategorii w legendach
+    return frame.astype({column: object for column in frame.columns
+                         if isinstance(frame[column].dtype, pd.CategoricalDtype)})
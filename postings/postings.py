@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from pipeline import pipeline
+
+
+def technology_pairs(combinations):
+    # (kod listy technologii, kod technologii) dla każdej technologii z każdej listy - na słowniku kategorii
+    names = sorted({name for combination in combinations for name in pipeline.split_technologies(combination)})
+    positions = {name: position for position, name in enumerate(names)}
+    pairs = [(code, positions[name]) for code, combination in enumerate(combinations)
+             for name in pipeline.split_technologies(combination)]
+    pairs = np.array(pairs, dtype='int64').reshape(-1, 2)
+    return names, pairs[:, 0], pairs[:, 1]
+
+
+def build_postings(all_offers):
+    # Indeks odwrócony technologia -> numery wierszy w formacie CSR (wiersze posortowane wg technologii
+    # i granice przedziałów), a oferta z kilkoma technologiami występuje na liście każdej z nich. Wiersze
+    # z tą samą listą technologii są grupowane raz, a potem doklejane do list jej technologii
+    combinations = all_offers['technologies']
+    names, pair_combinations, pair_technologies = technology_pairs(combinations.cat.categories)
+    codes = combinations.cat.codes.to_numpy()
+    combination_order = np.argsort(codes, kind='stable')
+    combination_bounds = np.searchsorted(codes[combination_order], np.arange(len(combinations.cat.categories) + 1))
+
+    order = np.lexsort((pair_combinations, pair_technologies))
+    pair_combinations, pair_technologies = pair_combinations[order], pair_technologies[order]
+    lengths = combination_bounds[pair_combinations + 1] - combination_bounds[pair_combinations]
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rows = combination_order[np.repeat(combination_bounds[pair_combinations], lengths) + offsets]
+    row_technologies = np.repeat(pair_technologies, lengths)
+    return {
+        'technologies': names,
+        'order': rows.astype('int32'),
+        'bounds': np.searchsorted(row_technologies, np.arange(len(names) + 1)),
+    }
+
+
+def posting_technologies(postings):
+    # Technologia każdej pozycji w 'order'
+    return pd.Categorical.from_codes(np.repeat(np.arange(len(postings['technologies'])),
+                                               np.diff(postings['bounds'])),
+                                     categories=postings['technologies'])
+
+
+def matching_combinations(combinations, technologies):
+    # Listy technologii (kategorie kolumny 'technologies') zawierające którąkolwiek z wybranych technologii
+    selected = set(technologies)
+    return [combination for combination in combinations
+            if selected.intersection(pipeline.split_technologies(combination))]
@@ -1,8 +1,18 @@
+import copy
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from cube import cube
+from histogram import histogram
+from pipeline import pipeline
+from sketch import sketch
+
+# Skala osi Y odpowiada wcześniejszej symulacji Monte Carlo (1000 losowań na ofertę)
+SAMPLES_PER_OFFER = 1000
+SALARY_BIN_WIDTH = 100
+MIXTURE_CHUNK_SIZE = 4096
 
 color_map = {
     'junior': '#56B4E9',
@@ -12,19 +22,31 @@ color_map = {
 }
 
 
-def show_salary_distribution_by_contract_type(all_offers):
-    b2b_salaries = all_offers[all_offers['contract type'] == 'b2b']['salary b2b mean'].dropna()
-    uop_salaries = all_offers[all_offers['contract type'] == 'employment']['salary employment mean'].dropna()
+def show_salary_distribution_by_contract_type(salary_sketches):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    b2b = sketch.salaries(salary_sketches[salary_sketches['contract type'] == 'b2b'], 'b2b')
+    uop = sketch.salaries(salary_sketches[salary_sketches['contract type'] == 'employment'], 'employment')
+    b2b_salaries, b2b_weights = b2b['salary'].to_numpy(), b2b['count'].to_numpy(dtype='float64')
+    uop_salaries, uop_weights = uop['salary'].to_numpy(), uop['count'].to_numpy(dtype='float64')
 
     colors = px.colors.qualitative.Dark2[:3]
 
+    # Wspólne kubełki dla obu typów umów, jak przy nakładających się histogramach w plotly
+    all_salaries = np.concatenate([b2b_salaries, uop_salaries])
+    bin_size = histogram.auto_bin_size(all_salaries, weights=np.concatenate([b2b_weights, uop_weights]))
+    edges = histogram.bin_edges(all_salaries, bin_size)
+
     fig = go.Figure()
 
-    fig.add_trace(go.Histogram(x=b2b_salaries, name='B2B', opacity=0.7, marker_color=colors[0]))
-    fig.add_trace(go.Histogram(x=uop_salaries, name='UoP', opacity=0.7, marker_color=colors[2]))
+    fig.add_trace(histogram.histogram_trace(b2b_salaries, edges, b2b_weights, name='B2B', opacity=0.7,
+                                            marker_color=colors[0]))
+    fig.add_trace(histogram.histogram_trace(uop_salaries, edges, uop_weights, name='UoP', opacity=0.7,
+                                            marker_color=colors[2]))
 
     fig.update_layout(
-        title='Rozkład wynagrodzeń dla B2B vs UoP',
+        title=pipeline.titled('Rozkład wynagrodzeń dla B2B vs UoP', salary_sketches['report date']),
         xaxis_title='Wynagrodzenie',
         yaxis_title='Liczba ofert',
         barmode='overlay',
@@ -35,180 +57,235 @@ def show_salary_distribution_by_contract_type(all_offers):
     return fig
 
 
-def show_salary_by_company_size_b2b(all_offers):
-    b2b_data = all_offers[all_offers['contract type'] == 'b2b'].dropna(subset=['salary b2b mean'])
-
-    fig = px.box(b2b_data,
-                 x='company size',
-                 y='salary b2b mean',
-                 title='Rozkład wynagrodzeń B2B według wielkości firmy',
-                 labels={'salary b2b mean': 'Wynagrodzenie B2B', 'company size': 'Wielkość firmy'},
-                 color='company size',
-                 color_discrete_sequence=px.colors.qualitative.Dark2)
+def show_salary_by_company_size_b2b(company_size_sketches):
+    b2b_data = sketch.salaries(company_size_sketches, 'b2b', ['company size'])
 
-    fig.update_layout(width=1000, height=600, showlegend=False)
-    fig.update_xaxes(categoryorder="category ascending")
+    fig = company_size_boxes(b2b_data, 'Wynagrodzenie B2B')
+    fig.update_layout(
+        title=pipeline.titled('Rozkład wynagrodzeń B2B według wielkości firmy',
+                              company_size_sketches['report date']),
+        width=1000, height=600, showlegend=False)
 
     # fig.write_html("salary/salary_by_company_size_b2b.html")
     return fig
 
 
-def show_salary_by_company_size_uop(all_offers):
-    uop_data = all_offers[all_offers['contract type'] == 'employment'].dropna(subset=['salary employment mean'])
-
-    fig = px.box(uop_data,
-                 x='company size',
-                 y='salary employment mean',
-                 title='Rozkład wynagrodzeń UoP według wielkości firmy',
-                 labels={'salary employment mean': 'Wynagrodzenie UoP', 'company size': 'Wielkość firmy'},
-                 color='company size',
-                 color_discrete_sequence=px.colors.qualitative.Dark2)
+def show_salary_by_company_size_uop(company_size_sketches):
+    uop_data = sketch.salaries(company_size_sketches, 'employment', ['company size'])
 
-    fig.update_layout(width=1000, height=600, showlegend=False)
-    fig.update_xaxes(categoryorder="category ascending")
+    fig = company_size_boxes(uop_data, 'Wynagrodzenie UoP')
+    fig.update_layout(
+        title=pipeline.titled('Rozkład wynagrodzeń UoP według wielkości firmy',
+                              company_size_sketches['report date']),
+        width=1000, height=600, showlegend=False)
 
     # fig.write_html("salary/salary_by_company_size_uop.html")
     return fig
 
 
-def wykres_zarobkow_dla_segmentu(all_offers, latest_offers, nazwa_segmentu, tekst_segmentu, kolejność=None):
-    latest_offers_clean = latest_offers.copy()
-    latest_offers_clean['offer'] = np.nan
+def company_size_boxes(salaries_by_size, salary_label):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    # Kwartyle i wąsy liczone na serwerze tak jak w plotly.js - do przeglądarki trafiają statystyki pudełek
+    # i wartości odstające (wartości kubełków szkiców) zamiast wszystkich wynagrodzeń
+    sizes = salaries_by_size['company size'].astype(object)
+    categories = pd.unique(sizes)
+    codes = pd.Categorical(sizes, categories=categories).codes.astype('int64')
+    salaries = salaries_by_size['salary'].to_numpy(dtype='float64')
+    weights = salaries_by_size['count'].to_numpy(dtype='float64')
+    quartiles = histogram.grouped_quantiles(codes, salaries, weights, len(categories), [0.25, 0.5, 0.75])
+
+    colors = px.colors.qualitative.Dark2
+    fig = go.Figure()
+    for code, size in enumerate(categories):
+        values = salaries[codes == code]
+        q1, median, q3 = quartiles[code]
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        inside = (values >= low) & (values <= high)
+        color = colors[code % len(colors)]
+
+        fig.add_trace(go.Box(
+            x=[size], q1=[q1], median=[median], q3=[q3],
+            lowerfence=[min(q1, values[inside].min())], upperfence=[max(q3, values[inside].max())],
+            name=size, legendgroup=size, offsetgroup=size, alignmentgroup='True', marker_color=color
+        ))
+        outliers = np.unique(values[~inside])
+        if outliers.size:
+            fig.add_trace(go.Scatter(
+                x=[size] * outliers.size, y=outliers, mode='markers', marker_color=color, legendgroup=size,
+                showlegend=False, hovertemplate=f"Wielkość firmy={size}<br>{salary_label}=%{{y}}<extra></extra>"
+            ))
+
+    fig.update_layout(boxmode='overlay', legend_title_text='Wielkość firmy')
+    fig.update_xaxes(title_text='Wielkość firmy', categoryorder="category ascending")
+    fig.update_yaxes(title_text=salary_label)
+    return fig
+
+
+def show_salary_percentiles_over_time(salary_sketches):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    # Mediana i pasmo P10-P90 ze scalonych szkiców komórek - filtr nie wymaga ponownego sortowania wynagrodzeń
+    stats = sketch.quantiles(salary_sketches, ['salary', 'seniority', 'report date'], [0.1, 0.5, 0.9]).reset_index()
+    stats = stats[stats['seniority'].isin(list(color_map))]
+
+    fig = make_subplots(rows=1, cols=2, subplot_titles=['B2B', 'UoP'], shared_yaxes=True, horizontal_spacing=0.05)
+    for col, salary in enumerate(['b2b', 'employment'], start=1):
+        for seniority, color in color_map.items():
+            rows = stats[(stats['salary'] == salary) & (stats['seniority'] == seniority)]
+            if rows.empty:
+                continue
+            dates = list(rows['report date'])
+            fig.add_trace(go.Scatter(
+                x=dates + dates[::-1], y=list(rows[0.9]) + list(rows[0.1])[::-1], fill='toself', fillcolor=color,
+                opacity=0.2, line=dict(width=0), hoverinfo='skip', legendgroup=seniority, showlegend=False
+            ), row=1, col=col)
+            fig.add_trace(go.Scatter(
+                x=dates, y=rows[0.5].round(-2), mode='lines+markers', name=seniority, line=dict(color=color),
+                legendgroup=seniority, showlegend=col == 1, customdata=rows[[0.1, 0.9]].round(-2),
+                hovertemplate="Mediana: %{y} zł<br>P10-P90: %{customdata[0]} - %{customdata[1]} zł"
+            ), row=1, col=col)
+
+    fig.update_layout(
+        title='Mediana wynagrodzeń w czasie (pasmo P10-P90)',
+        legend_title="Doświadczenie",
+        width=1200,
+        height=500
+    )
+    fig.update_yaxes(title_text='Wynagrodzenie (PLN)', col=1)
+
+    # fig.write_html("salary/salary_percentiles_over_time.html")
+    return fig
 
-    b2b_mask = latest_offers_clean['contract type'] == 'b2b'
-    latest_offers_clean.loc[b2b_mask, 'offer'] = latest_offers_clean.loc[b2b_mask, 'salary b2b mean']
 
-    emp_mask = latest_offers_clean['contract type'] == 'employment'
-    latest_offers_clean.loc[emp_mask, 'offer'] = latest_offers_clean.loc[emp_mask, 'salary employment mean']
+@lru_cache(maxsize=8)
+def subplot_grid(rows, cols):
+    from plotly.subplots import make_subplots
 
-    both_mask = latest_offers_clean['contract type'] == 'both'
-    latest_offers_clean.loc[both_mask, 'offer'] = (latest_offers_clean.loc[both_mask, 'salary b2b mean'].fillna(0) +
-                                                   latest_offers_clean.loc[both_mask, 'salary employment mean'].fillna(
-                                                       0)) / 2
-    latest_offers_clean['offer'] = pd.to_numeric(latest_offers_clean['offer'], errors='coerce')
-    latest_offers_clean = latest_offers_clean[np.isfinite(latest_offers_clean['offer'])]
+    # Osie i miejsca na tytuły siatki zależą tylko od jej rozmiaru, a make_subplots waliduje każdą oś
+    # osobno (setki ms) - siatka liczona raz, wykresy dostają jej kopię jako zwykły słownik
+    layout = make_subplots(rows=rows, cols=cols, subplot_titles=[' '] * (rows * cols),
+                           vertical_spacing=0.1, horizontal_spacing=0.05).layout.to_plotly_json()
+    layout.pop('template')
+    return layout
+
+
+def wykres_zarobkow_dla_segmentu(salary_sketches, nazwa_segmentu, tekst_segmentu, kolejność=None):
+    import plotly.graph_objects as go
+
+    latest_sketches = cube.latest_cube(salary_sketches)
+    latest_salaries = sketch.salaries(latest_sketches, 'offer', [nazwa_segmentu, 'seniority'])
 
     experience = ['Junior', 'Mid', 'Senior', 'Expert']
 
     if kolejność:
         segmenty = kolejność
     else:
-        latest_salaries = latest_offers_clean[np.isfinite(latest_offers_clean['offer'])]
-        segmenty = latest_salaries.groupby([nazwa_segmentu])['offer'].count().reset_index()
-        segmenty = segmenty[segmenty['offer'] > 100][nazwa_segmentu].to_list()
+        segmenty = latest_salaries.groupby([nazwa_segmentu], observed=True)['count'].sum().reset_index()
+        segmenty = segmenty[segmenty['count'] > 100][nazwa_segmentu].to_list()
+
+    latest_salaries = latest_salaries[latest_salaries[nazwa_segmentu].isin(segmenty)]
+    stats, histograms = histogram.grouped_histograms(latest_salaries, [nazwa_segmentu, 'seniority'], 'salary',
+                                                     weights=latest_salaries['count'])
+    cells = {key: (row, histograms[position]) for position, (key, row) in enumerate(stats.iterrows())}
 
     kolory = ['#56B4E9', '#009E73', '#E69F00', '#CC79A7']
 
-    subplot_titles = []
-    for _ in segmenty:
+    # Mediana i histogram dla każdej komórki (segment, poziom) - puste komórki dostają 0
+    komorki = []
+    for segment in segmenty:
         for poziom in experience:
-            subplot_titles.append(f"{poziom}")
-
-    fig = make_subplots(
-        rows=len(segmenty),
-        cols=4,
-        subplot_titles=subplot_titles,
-        vertical_spacing=0.1,
-        horizontal_spacing=0.05
-    )
-
-    for j, segment in enumerate(segmenty):
-        for i, poziom in enumerate(experience):
-            idx = j * 4 + i
-
-            # Filtracja i czyszczenie danych
-            dane = latest_offers_clean.loc[
-                (latest_offers_clean['seniority'] == poziom.lower()) &
-                (latest_offers_clean[nazwa_segmentu] == segment)
-                ]
-
-            if not dane.empty:
-                mediana = round(dane['offer'].median())
-                counts, bins = np.histogram(dane['offer'], bins=50)
-                max_count = counts.max() if counts.size > 0 else 0
-            else:
-                mediana = 0
-                max_count = 0
-
-            if not dane.empty and mediana > 0:
-                # Histogram
-                fig.add_trace(
-                    go.Histogram(
-                        x=dane['offer'],
-                        marker_color=kolory[i],
-                        showlegend=False,
-                        opacity=0.7,
-                        nbinsx=50
-                    ),
-                    row=j + 1,
-                    col=i + 1
-                )
-
-                # Linia mediany
-                fig.add_shape(
-                    type="line",
-                    x0=mediana,
-                    x1=mediana,
-                    y0=0,
-                    y1=max_count * 1.1,
-                    line=dict(color="black", width=3),
-                    xref=f"x{idx + 1}",
-                    yref=f"y{idx + 1}"
-                )
-
-                # Adnotacje
-                fig.add_annotation(
-                    x=mediana + 5000,
-                    y=max_count * 0.8,
-                    text=f"{segment}<br>Mediana: {mediana} zł",
-                    showarrow=False,
-                    bgcolor="white",
-                    bordercolor="black",
-                    borderwidth=1,
-                    xref=f"x{idx + 1}",
-                    yref=f"y{idx + 1}"
-                )
-
-                # Tytuł z medianą
-                fig.layout.annotations[idx].update(text=f"{poziom}<br>Mediana: {mediana} zł")
-            else:
-                # Ukryj pusty wykres
-                fig.update_xaxes(visible=False, row=j + 1, col=i + 1)
-                fig.update_yaxes(visible=False, row=j + 1, col=i + 1)
-                fig.add_annotation(
-                    text="<b>Brak danych</b>",
-                    xref=f"x{idx + 1}",
-                    yref=f"y{idx + 1}",
-                    x=0.5,
-                    y=0.5,
-                    showarrow=False,
-                    font=dict(size=14, color="red")
-                )
-
-    fig.update_layout(
-        title_text=f"<b>Rozkład zarobków według {tekst_segmentu}</b>",
+            dane, (bins, counts) = cells.get((segment, poziom.lower()), (None, (None, None)))
+            mediana = round(dane['median']) if dane is not None else 0
+            komorki.append((segment, poziom, dane, bins, counts, mediana))
+
+    # Cały układ jako jeden słownik i jedna walidacja w go.Figure - każde update_layout/add_traces
+    # na siatce kilkudziesięciu osi waliduje ją od nowa
+    layout = copy.deepcopy(subplot_grid(len(segmenty), 4))
+    annotations = layout['annotations']
+    for annotation, (_, poziom, _, _, _, mediana) in zip(annotations, komorki):
+        annotation['text'] = f"{poziom}<br>Mediana: {mediana} zł" if mediana > 0 else f"{poziom}"
+
+    traces = []
+    shapes = []
+
+    for idx, (segment, poziom, dane, bins, counts, mediana) in enumerate(komorki):
+        j, i = divmod(idx, 4)
+        axis_suffix = idx + 1 if idx else ''
+
+        if mediana > 0:
+            max_count = dane['max count']
+
+            # Histogram
+            traces.append(histogram.bins_trace(
+                dane['low'],
+                dane['bin size'],
+                bins,
+                counts,
+                marker_color=kolory[i],
+                showlegend=False,
+                opacity=0.7,
+                xaxis=f"x{axis_suffix}",
+                yaxis=f"y{axis_suffix}"
+            ))
+
+            # Linia mediany
+            shapes.append(dict(
+                type="line",
+                x0=mediana,
+                x1=mediana,
+                y0=0,
+                y1=max_count * 1.1,
+                line=dict(color="black", width=3),
+                xref=f"x{idx + 1}",
+                yref=f"y{idx + 1}"
+            ))
+
+            # Adnotacje
+            annotations.append(dict(
+                x=mediana + 5000,
+                y=max_count * 0.8,
+                text=f"{segment}<br>Mediana: {mediana} zł",
+                showarrow=False,
+                bgcolor="white",
+                bordercolor="black",
+                borderwidth=1,
+                xref=f"x{idx + 1}",
+                yref=f"y{idx + 1}"
+            ))
+        else:
+            # Ukryj pusty wykres
+            layout[f"xaxis{axis_suffix}"]['visible'] = False
+            layout[f"yaxis{axis_suffix}"]['visible'] = False
+            annotations.append(dict(
+                text="<b>Brak danych</b>",
+                xref=f"x{idx + 1}",
+                yref=f"y{idx + 1}",
+                x=0.5,
+                y=0.5,
+                showarrow=False,
+                font=dict(size=14, color="red")
+            ))
+
+    for idx in range(len(komorki) - 4, len(komorki)):
+        layout[f"xaxis{idx + 1 if idx else ''}"]['title'] = dict(text="Wynagrodzenie (PLN)", font=dict(size=12))
+
+    title = pipeline.titled(f'Rozkład zarobków według {tekst_segmentu}', latest_sketches['report date'])
+    layout.update(
+        shapes=shapes,
+        title=dict(text=f"<b>{title}</b>", x=0.5, font=dict(size=20)),
         height=250 * len(segmenty),
         width=1400,
-        margin=dict(t=120),
-        title_x=0.5,
-        title_font=dict(size=20)
+        margin=dict(t=120)
     )
-
-    for i in range(1, 5):
-        fig.update_xaxes(
-            title_text="Wynagrodzenie (PLN)",
-            row=len(segmenty),
-            col=i,
-            title_font=dict(size=12)
-        )
-
-    return fig
+    return go.Figure(data=traces, layout=layout)
 
 
-def show_salary_by_technology(all_offers, latest_offers):
+def show_salary_by_technology(salary_sketches):
     fig = wykres_zarobkow_dla_segmentu(
-        all_offers,
-        latest_offers,
+        salary_sketches,
         'technology',
         "technologii",
         ['Java', 'Python', 'C#', 'C/C++', 'JavaScript', 'PHP', "Kotlin"]
@@ -217,10 +294,9 @@ def show_salary_by_technology(all_offers, latest_offers):
     return fig
 
 
-def show_salary_by_city(all_offers, latest_offers):
+def show_salary_by_city(salary_sketches):
     fig = wykres_zarobkow_dla_segmentu(
-        all_offers,
-        latest_offers,
+        salary_sketches,
         'location',
         "miasta",
         ['Warszawa', 'Katowice', 'Wrocław', 'Gdańsk']
@@ -229,15 +305,19 @@ def show_salary_by_city(all_offers, latest_offers):
     return fig
 
 
-def show_salary_by_seniority(all_offers):
-    offers = all_offers.copy()
+def show_salary_by_seniority(range_sketches):
+    import plotly.graph_objects as go
+
+    # Widełki UoP ze szkicu: wartość kubełka środka +/- połowa szerokości ('spread' w procentach środka)
+    latest_sketches = cube.latest_cube(range_sketches)
+    ranges = latest_sketches.groupby(['seniority', 'bin', 'spread'], observed=True)['count'].sum()
+    ranges = ranges[ranges > 0].reset_index()
+    middle = sketch.bin_values(ranges['bin'])
+    half_range = middle * ranges['spread'].to_numpy(dtype='float64') / 100
 
-    offers['offer'] = offers.apply(lambda x: get_offers(x['salary employment min'], x['salary employment max']), axis=1)
-    offers = offers.drop(columns=['salary employment min', 'salary employment max', 'salary employment mean'])
-    offers = offers.set_index(offers.columns[:-1].to_list())
-    offers = offers.apply(lambda x: x.str.split('|').explode()).reset_index()
-    offers['offer'] = offers['offer'].astype('float')
-    latest_offers = offers[offers['report date'] == offers['report date'].unique().max()]
+    mean, sd = salary_distribution(middle - half_range, middle + half_range)
+    weights = ranges['count'].to_numpy(dtype='float64')
+    edges = salary_bin_edges(mean, sd) if mean.size else None
 
     seniority_levels = ['junior', 'mid', 'senior', 'expert']
     colors = ['#56B4E9', '#009E73', '#E69F00', '#CC79A7']
@@ -245,12 +325,19 @@ def show_salary_by_seniority(all_offers):
     fig = go.Figure()
 
     for i, seniority in enumerate(seniority_levels):
-        subset = latest_offers[latest_offers['seniority'] == seniority]
-        subset = subset[subset['offer'].notna()]
-        median_salary = round(subset['offer'].median() / 100) * 100
-
-        fig.add_trace(go.Histogram(
-            x=subset['offer'],
+        mask = (ranges['seniority'] == seniority).to_numpy()
+        if not mask.any():
+            continue
+
+        # Oczekiwany histogram symulacji (SAMPLES_PER_OFFER próbek na ofertę) liczony analitycznie
+        cdf = mixture_cdf(mean[mask], sd[mask], edges, weights[mask])
+        counts = np.round(np.diff(cdf) * SAMPLES_PER_OFFER)
+        median_salary = round(mixture_median(cdf, edges) / 100) * 100
+
+        fig.add_trace(histogram.bar_trace(
+            edges,
+            counts,
+            bargap=0.1,
             name=seniority,
             marker_color=colors[i],
             opacity=0.75,
@@ -277,7 +364,7 @@ def show_salary_by_seniority(all_offers):
         )
 
     fig.update_layout(
-        title='Porównanie zarobków na tle doświadczenia',
+        title=pipeline.titled('Porównanie zarobków na tle doświadczenia', latest_sketches['report date']),
         xaxis_title='Wynagrodzenie w tysiącach (PLN)',
         yaxis_title='Liczba ofert',
         barmode='overlay',
@@ -295,8 +382,39 @@ def show_salary_by_seniority(all_offers):
     return fig
 
 
-def get_offers(min_val, max_val):
+def salary_distribution(min_val, max_val):
+    # Widełki traktujemy jak rozkład normalny: średnia w środku widełek, 3 odchylenia na połowę ich szerokości
     mean = (max_val + min_val) / 2
-    range_val = max(mean * 0.1, (max_val - min_val) / 2)
-    salary = np.random.normal(mean, range_val / 3, size=1000).round()
-    return '|'.join(salary.astype('str').tolist())
+    range_val = np.maximum(mean * 0.1, (max_val - min_val) / 2)
+    return mean, range_val / 3
+
+
+def salary_bin_edges(mean, sd, bin_width=SALARY_BIN_WIDTH):
+    low = max(0.0, np.floor((mean - 4 * sd).min() / bin_width) * bin_width)
+    high = np.ceil((mean + 4 * sd).max() / bin_width) * bin_width
+    return np.arange(low, high + bin_width, bin_width)
+
+
+def mixture_cdf(mean, sd, edges, weights=None):
+    # Suma dystrybuant rozkładów poszczególnych ofert w punktach siatki; powtarzające się widełki liczone raz
+    params, index = np.unique(np.column_stack([mean, sd]), axis=0, return_inverse=True)
+    weights = np.bincount(index.ravel(), weights, minlength=len(params))
+    cdf = np.zeros(len(edges))
+    for start in range(0, len(params), MIXTURE_CHUNK_SIZE):
+        chunk = params[start:start + MIXTURE_CHUNK_SIZE]
+        z = (edges[np.newaxis, :] - chunk[:, [0]]) / chunk[:, [1]]
+        cdf += weights[start:start + MIXTURE_CHUNK_SIZE] @ normal_cdf(z)
+    return cdf
+
+
+def mixture_median(cdf, edges):
+    return np.interp(cdf[-1] / 2, cdf, edges)
+
+
+def normal_cdf(z):
+    # Przybliżenie funkcji erf (Abramowitz i Stegun 7.1.26), błąd bezwzględny < 1.5e-7
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
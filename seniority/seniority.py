@@ -1,8 +1,9 @@
 from math import pi
 
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+
+from cube import cube
+from pipeline import pipeline
 
 color_map = {
     'junior': '#56B4E9',
@@ -12,11 +13,14 @@ color_map = {
 }
 
 
-def show_seniority_trends_over_time(all_offers):
-    seniority_trends = all_offers.groupby([
+def show_seniority_trends_over_time(offers_cube):
+    import plotly.express as px
+
+    seniority_trends = cube.rollup(offers_cube, [
         pd.Grouper(key='report date', freq='ME'),
         'seniority'
-    ]).size().reset_index(name='count')
+    ]).reset_index(name='count')
+    seniority_trends = pipeline.decategorize(seniority_trends)
 
     fig = px.line(
         seniority_trends,
@@ -50,15 +54,16 @@ def show_seniority_trends_over_time(all_offers):
     return fig
 
 
-def show_technology_by_seniority(latest_offers):
+def show_technology_by_seniority(latest_technology_cube):
+    import plotly.graph_objects as go
+
     new_order = ['junior', 'mid', 'senior', 'expert']
-    tech_senior = latest_offers.explode('technology').groupby(['technology', 'seniority']).size().unstack()
+    tech_senior = cube.rollup(latest_technology_cube, ['technology', 'seniority']).unstack()
     tech_senior = tech_senior.div(tech_senior.sum(axis=1), axis=0)
     tech_senior = tech_senior.fillna(0)
-    tech_senior = tech_senior[new_order]
-    top_techs = latest_offers.explode('technology')['technology'].value_counts().head(10).index.tolist()
+    tech_senior = tech_senior.reindex(columns=new_order, fill_value=0)
+    top_techs = cube.counts(latest_technology_cube, 'technology').head(10).index.tolist()
     tech_senior = tech_senior.loc[tech_senior.index.isin(top_techs)]
-    print(tech_senior)
 
     categories = tech_senior.index.tolist()
     N = len(categories)
@@ -76,7 +81,7 @@ def show_technology_by_seniority(latest_offers):
 
         fig.add_trace(go.Scatterpolar(
             r=values,
-            theta=categories + [categories[0]],
+            theta=categories + categories[:1],
             name=seniority,
             line=dict(color=colors[i], width=2),
             fill='toself',
@@ -93,7 +98,8 @@ def show_technology_by_seniority(latest_offers):
                 ticktext=["25%", "50%", "75%", "100%"]
             )
         ),
-        title="Porównanie ofert o określonym poziomie doświadczenia a technologia",
+        title=pipeline.titled("Porównanie ofert o określonym poziomie doświadczenia a technologia",
+                              latest_technology_cube['report date']),
         width=800,
         height=800,
         legend=dict(
@@ -110,8 +116,10 @@ def show_technology_by_seniority(latest_offers):
     return fig
 
 
-def show_seniority_distribution(all_offers):
-    seniority_counts = all_offers['seniority'].value_counts().reset_index()
+def show_seniority_distribution(offers_cube):
+    import plotly.express as px
+
+    seniority_counts = cube.counts(offers_cube, 'seniority').reset_index()
     seniority_counts.columns = ['seniority', 'count']
 
     seniority_order = ['junior', 'mid', 'senior', 'expert']
@@ -126,7 +134,7 @@ def show_seniority_distribution(all_offers):
         seniority_counts,
         x='seniority',
         y='count',
-        title='Rozkład poziomów doświadczenia w ofertach pracy',
+        title=pipeline.titled('Rozkład poziomów doświadczenia w ofertach pracy', offers_cube['report date']),
         labels={'seniority': 'Poziom doświadczenia', 'count': 'Liczba ofert'},
         text='count',
         color='seniority',
@@ -140,20 +148,23 @@ def show_seniority_distribution(all_offers):
     return fig
 
 
-def show_seniority_by_city(all_offers):
-    non_remote = all_offers[all_offers['location'] != 'Remote']
-    top_cities = non_remote['location'].value_counts().head(10).index.tolist()
+def show_seniority_by_city(offers_cube):
+    import plotly.express as px
+
+    non_remote = offers_cube[offers_cube['location'] != 'Remote']
+    top_cities = cube.counts(non_remote, 'location').head(10).index.tolist()
 
     city_data = non_remote[non_remote['location'].isin(top_cities)]
 
-    city_seniority = city_data.groupby(['location', 'seniority']).size().reset_index(name='count')
+    city_seniority = cube.rollup(city_data, ['location', 'seniority']).reset_index(name='count')
+    city_seniority = pipeline.decategorize(city_seniority)
 
     fig = px.bar(
         city_seniority,
         x='location',
         y='count',
         color='seniority',
-        title='Rozkład poziomów doświadczenia w ofertach pracy według miast',
+        title=pipeline.titled('Rozkład poziomów doświadczenia w ofertach pracy według miast', offers_cube['report date']),
         labels={'location': 'Miasto', 'count': 'Liczba ofert', 'seniority': 'Poziom doświadczenia'},
         color_discrete_map=color_map
     )
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from cube import cube
+from pipeline import pipeline
+
+# Szkic w stylu DDSketch: kubełki logarytmiczne, więc każda wartość odtworzona ze szkicu (także kwantyl)
+# różni się od dokładnej najwyżej o RELATIVE_ACCURACY
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+# Wynagrodzenia spoza zakresu trafiają do skrajnych kubełków - komórka ma najwyżej MAX_BINS kubełków
+# na rodzaj wynagrodzenia, niezależnie od liczby ofert
+MIN_SALARY, MAX_SALARY = 1_000, 250_000
+MIN_BIN, MAX_BIN = (int(np.ceil(np.log(salary) / np.log(GAMMA))) for salary in (MIN_SALARY, MAX_SALARY))
+MAX_BINS = MAX_BIN - MIN_BIN + 1
+
+SKETCH_SALARIES = {'b2b': 'salary b2b mean', 'employment': 'salary employment mean'}
+# 'offer' to jedna kwota na ofertę (offer_salaries) - do wykresów zarobków według technologii i miasta
+SALARY_KINDS = list(SKETCH_SALARIES) + ['offer']
+SKETCH_DIMENSIONS = cube.CUBE_DIMENSIONS
+SKETCH_KEYS = SKETCH_DIMENSIONS + ['salary', 'bin']
+
+# Wąskie szkice tylko dla wykresów, które ich potrzebują: wynagrodzenia według wielkości firmy (pudełka)
+# i widełki UoP (wykres według doświadczenia). Wymiary filtrów zostają, żeby filtrowało się je tak samo
+FILTER_DIMENSIONS = ['report date', 'location', 'technology', 'seniority']
+COMPANY_SIZE_KEYS = FILTER_DIMENSIONS + ['company size', 'salary', 'bin']
+# 'spread' to połowa szerokości widełek jako procent ich środka, w krokach SPREAD_STEP; poniżej 10%
+# wykres i tak przyjmuje 10% (salary.salary_distribution)
+RANGE_KEYS = FILTER_DIMENSIONS + ['bin', 'spread']
+SPREAD_STEP = 2
+MIN_SPREAD, MAX_SPREAD = 10, 100
+
+
+def offer_salaries(offers):
+    # Jedna kwota na ofertę: widełki B2B albo UoP, a przy obu typach umów średnia z nich
+    contract_type = offers['contract type'].to_numpy()
+    b2b = offers['salary b2b mean'].to_numpy(dtype='float64')
+    employment = offers['salary employment mean'].to_numpy(dtype='float64')
+    return np.select(
+        [contract_type == 'b2b', contract_type == 'employment', contract_type == 'both'],
+        [b2b, employment, (np.nan_to_num(b2b) + np.nan_to_num(employment)) / 2],
+        default=np.nan
+    )
+
+
+def salary_bins(values):
+    return np.ceil(np.log(np.clip(values, MIN_SALARY, MAX_SALARY)) / np.log(GAMMA)).astype('int16')
+
+
+def bin_values(bins):
+    # Wartość reprezentująca kubełek (GAMMA^(i-1), GAMMA^i] - względny błąd najwyżej RELATIVE_ACCURACY
+    return 2 * GAMMA ** np.asarray(bins, dtype='float64') / (GAMMA + 1)
+
+
+def count_bins(offers, rows, keys, **columns):
+    # Wybrane wiersze (tylko potrzebne kolumny) zwinięte do liczby ofert w komórce i kubełku
+    part = offers.loc[rows, [key for key in keys if key not in columns]].assign(**columns)
+    return cube.restore_dimensions(
+        part.groupby(keys, observed=True, dropna=False).size().reset_index(name='count'), part, keys)
+
+
+def build_sketches(all_offers):
+    # Dla każdej komórki kostki ofert i rodzaju wynagrodzenia liczba ofert w kubełkach logarytmicznych.
+    # Szkice łączy się sumowaniem liczności, więc dowolny wycinek to groupby na gotowych komórkach.
+    # Każdy rodzaj zwijany osobno - w pamięci naraz tylko wiersze jednego rodzaju
+    salaries = {salary: all_offers[column].to_numpy(dtype='float64') for salary, column in SKETCH_SALARIES.items()}
+    salaries['offer'] = offer_salaries(all_offers)
+    parts = []
+    for code, salary in enumerate(SALARY_KINDS):
+        present = ~np.isnan(salaries[salary])
+        parts.append(count_bins(
+            all_offers, present, SKETCH_KEYS,
+            salary=pd.Categorical.from_codes(np.full(present.sum(), code), categories=SALARY_KINDS),
+            bin=salary_bins(salaries[salary][present])))
+    return pipeline.concat_months(parts)
+
+
+def build_company_size_sketches(all_offers):
+    # Wynagrodzenia ofert tylko z B2B albo tylko z UoP według wielkości firmy - jak na wykresach pudełkowych
+    parts = []
+    for code, salary in enumerate(SKETCH_SALARIES):
+        values = all_offers[SKETCH_SALARIES[salary]].to_numpy(dtype='float64')
+        present = (all_offers['contract type'] == salary).to_numpy() & ~np.isnan(values)
+        parts.append(count_bins(
+            all_offers, present, COMPANY_SIZE_KEYS,
+            salary=pd.Categorical.from_codes(np.full(present.sum(), code), categories=list(SKETCH_SALARIES)),
+            bin=salary_bins(values[present])))
+    return pipeline.concat_months(parts)
+
+
+def build_range_sketches(all_offers):
+    # Widełki UoP: kubełek środka widełek i ich połowa szerokości względem środka
+    low = all_offers['salary employment min'].to_numpy(dtype='float64')
+    high = all_offers['salary employment max'].to_numpy(dtype='float64')
+    middle = (low + high) / 2
+    present = ~np.isnan(middle) & (middle > 0)
+    spread = np.rint((high - low)[present] / 2 / middle[present] * 100 / SPREAD_STEP) * SPREAD_STEP
+    return count_bins(all_offers, present, RANGE_KEYS, bin=salary_bins(middle[present]),
+                      spread=np.clip(spread, MIN_SPREAD, MAX_SPREAD).astype('int16'))
+
+
+def salaries(sketches, salary, keys=()):
+    # Wynagrodzenia jednego rodzaju jako wartości kubełków z liczbą ofert - do histogramów i kwartyli
+    # liczonych z wagami
+    merged = sketches[sketches['salary'] == salary].groupby(list(keys) + ['bin'], observed=True)['count'].sum()
+    merged = merged[merged > 0].reset_index()
+    merged['salary'] = bin_values(merged.pop('bin'))
+    return merged
+
+
+def quantiles(sketches, keys, levels):
+    # Szkice komórek scalone do grup keys. Kwantyle jak w histogram.grouped_quantiles (pozycja p*N - 0.5),
+    # k-ta wartość to wartość jej kubełka
+    merged = sketches.groupby(keys + ['bin'], observed=True)['count'].sum()
+    merged = merged[merged > 0]
+    counts = merged.to_numpy(dtype='float64')
+    values = bin_values(merged.index.get_level_values('bin'))
+    groups = merged.index.droplevel('bin')
+    # Wynik groupby jest posortowany, więc kubełki jednej grupy leżą obok siebie
+    starts = np.flatnonzero(~groups.duplicated())
+    ends = np.r_[starts, len(groups)][1:]
+
+    cumulative = np.cumsum(counts)
+    before = np.r_[0.0, cumulative][starts]
+    totals = cumulative[ends - 1] - before
+
+    def order_statistic(rank):
+        return values[np.clip(np.searchsorted(cumulative, before + rank, side='right'), starts, ends - 1)]
+
+    result = pd.DataFrame({'count': totals.round().astype('int64')}, index=groups[starts])
+    for level in levels:
+        position = np.clip(level * totals - 0.5, 0, totals - 1)
+        lower, upper = np.floor(position), np.ceil(position)
+        low_values, high_values = order_statistic(lower), order_statistic(upper)
+        result[level] = low_values + (position - lower) * (high_values - low_values)
+    return result
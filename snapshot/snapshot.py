@@ -0,0 +1,102 @@
+import hashlib
+import os
+from contextlib import contextmanager
+from glob import glob
+
+import pandas as pd
+
+from metrics import metrics
+from pipeline import pipeline
+
+try:
+    import pyarrow  # noqa: F401
+
+    SNAPSHOT_FORMAT = 'parquet'
+except ImportError:
+    # Bez pyarrow zapisujemy pickle - też zachowuje typy kolumn, tylko nie jest formatem kolumnowym
+    SNAPSHOT_FORMAT = 'pkl'
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: bez blokady - serwer z wieloma workerami (gunicorn) i tak działa tylko na systemach POSIX
+    fcntl = None
+
+CACHE_DIR = '.cache'
+SNAPSHOT_PREFIX = 'all_offers-'
+
+
+def dataset_key(files):
+    digest = hashlib.sha256(f"pipeline={pipeline.PIPELINE_VERSION}".encode())
+    for report_date, path in sorted(files.items()):
+        stat = os.stat(path)
+        digest.update(f"|{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path(key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{SNAPSHOT_PREFIX}{key}.{SNAPSHOT_FORMAT}")
+
+
+def read_snapshot(path):
+    if SNAPSHOT_FORMAT == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def write_snapshot(all_offers, path):
+    # Zapis do pliku tymczasowego i podmiana, żeby równolegle startujący proces nie wczytał połowy pliku
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if SNAPSHOT_FORMAT == 'parquet':
+        all_offers.to_parquet(tmp_path)
+    else:
+        all_offers.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def remove_stale_snapshots(current_path, cache_dir=CACHE_DIR):
+    # Pliki tymczasowe (write_snapshot) zostają - mogą należeć do zapisu trwającego w innym procesie
+    for path in glob(os.path.join(cache_dir, f"{SNAPSHOT_PREFIX}*")):
+        if path != current_path and not path.endswith('.tmp'):
+            os.remove(path)
+
+
+def load_prepared_offers(dataset_dir='dataset', cache_dir=CACHE_DIR):
+    files = pipeline.find_dataset_files(dataset_dir)
+    path = snapshot_path(dataset_key(files), cache_dir)
+
+    if os.path.exists(path):
+        with metrics.timer('dashboard_dataset_load_seconds', source='snapshot'):
+            all_offers = read_snapshot(path)
+    else:
+        with metrics.timer('dashboard_dataset_load_seconds', source='csv'):
+            all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+        store_prepared_offers(all_offers, files, cache_dir)
+
+    return all_offers, pipeline.latest_offers(all_offers)
+
+
+@contextmanager
+def cache_lock(cache_dir):
+    # Blokada na samym katalogu cache, bez osobnego pliku - zwalniana też przy śmierci procesu
+    if fcntl is None:
+        yield
+        return
+    descriptor = os.open(cache_dir, os.O_RDONLY)
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(descriptor)
+
+
+def store_prepared_offers(all_offers, files, cache_dir=CACHE_DIR):
+    # Każdy worker dopisuje nowy miesiąc do swoich danych, ale snapshot zapisuje tylko jeden z nich -
+    # pozostałe czekają na blokadę i zastają gotowy plik tego samego zbioru
+    path = snapshot_path(dataset_key(files), cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    with cache_lock(cache_dir):
+        if os.path.exists(path):
+            return
+        write_snapshot(all_offers, path)
+        remove_stale_snapshots(path, cache_dir)
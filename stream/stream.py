@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from aggregates import aggregates
+from identity import identity
+from metrics import metrics
+from pipeline import pipeline
+
+CHUNK_SIZE = 100_000
+# Kolumny używane przez wykresy; company nie jest nigdzie rysowane, a id zostaje tylko jako skrót w indeksie ofert
+STREAM_COLUMNS = ['id', 'company size', 'location', 'technology', 'seniority', 'salary employment min',
+                  'salary employment max', 'salary b2b min', 'salary b2b max']
+
+
+def read_chunks(path, chunksize=CHUNK_SIZE):
+    dtype = {column: pipeline.OFFER_DTYPES[column] for column in STREAM_COLUMNS}
+    try:
+        yield from pd.read_csv(path, dtype=dtype, usecols=STREAM_COLUMNS, chunksize=chunksize)
+    except pd.errors.EmptyDataError:
+        # Pusty plik (bez nagłówka) to miesiąc bez ofert
+        return
+
+
+def empty_chunk():
+    return pd.DataFrame({column: pd.Series(dtype=pipeline.OFFER_DTYPES[column]) for column in STREAM_COLUMNS})
+
+
+def empty_index():
+    return identity.build_index(np.array([], dtype='uint64'), np.array([], dtype='datetime64[ns]'))
+
+
+def aggregate_chunk(chunk, report_date, offer_index):
+    chunk['report date'] = pd.Timestamp(report_date)
+    offers = identity.mark_previous_seen(pipeline.prepare_offers(chunk), offer_index)
+    return aggregates.build_aggregates(offers), np.unique(offers['id hash'].to_numpy())
+
+
+def aggregate_month(path, report_date, offer_index, chunksize=CHUNK_SIZE):
+    # Każda porcja wierszy od razu zwijana do kostek i szkiców; poprzednie wystąpienie oferty pochodzi z indeksu
+    # wcześniejszych miesięcy. Zwraca kostki miesiąca i zbiór skrótów jego id
+    parts, hashes, buffered = [], [], 0
+    for chunk in read_chunks(path, chunksize):
+        month, month_hashes = aggregate_chunk(chunk, report_date, offer_index)
+        parts.append(month)
+        hashes.append(month_hashes)
+        buffered += aggregates.cells(month)
+        # Bufor scalany, gdy przekroczy porcję - pamięć zależy od porcji i liczby komórek, a nie od liczby ofert
+        if buffered > chunksize:
+            parts, hashes = [aggregates.merge_aggregates(parts)], [np.unique(np.concatenate(hashes))]
+            buffered = aggregates.cells(parts[0])
+
+    if not parts:
+        # Plik bez wierszy - puste kostki o tych samych kolumnach
+        return aggregate_chunk(empty_chunk(), report_date, offer_index)
+    return aggregates.merge_aggregates(parts), np.unique(np.concatenate(hashes))
+
+
+def aggregate_months(files, offer_index, chunksize=CHUNK_SIZE):
+    # Miesiące po kolei - każdy następny widzi w indeksie oferty ze wszystkich poprzednich
+    months = []
+    for report_date, path in sorted(files.items()):
+        month, hashes = aggregate_month(path, report_date, offer_index, chunksize)
+        report_dates = np.full(len(hashes), np.datetime64(report_date, 'ns'))
+        offer_index = identity.append_months(offer_index, hashes, report_dates)
+        months.append(month)
+    return aggregates.concat_aggregates(months), offer_index
+
+
+def aggregate_offers(dataset_dir='dataset', chunksize=CHUNK_SIZE):
+    files = pipeline.find_dataset_files(dataset_dir)
+    if not files:
+        raise FileNotFoundError(f"Brak plików {pipeline.DATASET_PATTERN} w katalogu {dataset_dir}")
+
+    with metrics.timer('dashboard_dataset_load_seconds', source='stream'):
+        return aggregate_months(files, empty_index(), chunksize)
+
+
+def ingest_months(new_files, offer_index, chunksize=CHUNK_SIZE):
+    # Kostki nowych miesięcy i indeks ofert uzupełniony o ich id - do dopisania do bieżącego stanu
+    return aggregate_months(new_files, offer_index, chunksize)
@@ -0,0 +1,92 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline import pipeline
+
+SALARY_COLUMNS = ['salary employment min', 'salary employment max', 'salary b2b min', 'salary b2b max']
+HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+
+def fit_profile(dataset_dir='dataset'):
+    files = pipeline.find_dataset_files(dataset_dir)
+    months = [pipeline.read_month(path, report_date) for report_date, path in files.items()]
+
+    # Rozkład łączny firma/wielkość/miasto/technologia/seniority/widełki razem z brakami danych to po prostu
+    # zbiór wierszy źródłowych - losujemy z niego całe wiersze, więc zależności między kolumnami zostają zachowane
+    offers = pipeline.concat_months(months).drop(columns=['id', 'report date'])
+
+    # Część ofert przechodzi na kolejny miesiąc z tym samym id
+    retention = np.mean([np.isin(current['id'], previous['id']).mean()
+                         for previous, current in zip(months, months[1:])]) if len(months) > 1 else 0.0
+
+    # Szerokość jądra dla wygładzenia widełek (reguła Silvermana na logarytmie pensji)
+    log_salaries = np.log(offers[['salary employment min', 'salary b2b min']].stack().to_numpy(dtype='float64'))
+    bandwidth = 1.06 * log_salaries.std() * len(log_salaries) ** -0.2
+
+    return {
+        'offers': offers,
+        'retention': float(retention),
+        'bandwidth': float(bandwidth),
+        'rows per month': round(np.mean([len(month) for month in months])),
+    }
+
+
+def random_ids(count, rng):
+    # 32 znaki hex jak w oryginalnych plikach, bez pętli po wierszach
+    random_bytes = rng.integers(0, 256, size=(count, 16), dtype=np.uint8)
+    digits = np.empty((count, 32), dtype=np.uint8)
+    digits[:, 0::2] = HEX_DIGITS[random_bytes >> 4]
+    digits[:, 1::2] = HEX_DIGITS[random_bytes & 15]
+    return digits.view('S32').ravel().astype(str)
+
+
+def generate_month(profile, rows, rng, previous=None):
+    source = profile['offers']
+    carried = 0 if previous is None else min(round(profile['retention'] * rows), len(previous))
+    fresh = rows - carried
+
+    new_offers = source.iloc[rng.integers(0, len(source), size=fresh)].reset_index(drop=True)
+    # Ten sam mnożnik dla wszystkich widełek wiersza - zachowuje relacje min/max i UoP/B2B; braki zostają brakami
+    factor = np.exp(rng.normal(0.0, profile['bandwidth'], size=fresh)).astype('float32')
+    new_offers[SALARY_COLUMNS] = (new_offers[SALARY_COLUMNS].to_numpy() * factor[:, None] / 100).round() * 100
+    new_offers.insert(0, 'id', random_ids(fresh, rng))
+
+    if not carried:
+        return new_offers
+    carried_offers = previous.iloc[rng.choice(len(previous), size=carried, replace=False)]
+    return pipeline.concat_months([carried_offers.reset_index(drop=True), new_offers])
+
+
+def generate_dataset(target_dir, months=11, rows=None, start='2023-09', dataset_dir='dataset', seed=0):
+    profile = fit_profile(dataset_dir)
+    rows = rows or profile['rows per month']
+    rng = np.random.default_rng(seed)
+    os.makedirs(target_dir, exist_ok=True)
+
+    previous = None
+    for report_date in pd.date_range(start, periods=months, freq='MS'):
+        previous = generate_month(profile, rows, rng, previous)
+        previous.to_csv(os.path.join(target_dir, f"{report_date:%Y%m}_soft_eng_jobs_pol.csv"), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Syntetyczne pliki miesięczne o rozkładzie zgodnym z dataset/")
+    parser.add_argument('target_dir')
+    parser.add_argument('--months', type=int, default=11)
+    parser.add_argument('--rows', type=int, help="liczba ofert w miesiącu (domyślnie średnia z dataset/)")
+    parser.add_argument('--start', default='2023-09', help="pierwszy miesiąc, RRRR-MM")
+    parser.add_argument('--dataset-dir', default='dataset')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate_dataset(args.target_dir, args.months, args.rows, args.start, args.dataset_dir, args.seed)
+    print(f"Wygenerowano {args.months} miesięcy w {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
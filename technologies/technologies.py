@@ -1,10 +1,14 @@
 import pandas as pd
-import plotly.express as px
 
+from cube import cube
+from pipeline import pipeline
 
-def show_technology_distribution(all_offers, technology_colors):
-    tech_data = all_offers.explode('technology')
-    tech_counts = tech_data['technology'].value_counts().reset_index()
+
+# Wykresy technologii dostają kostkę z wierszem na każdą technologię oferty (cube.build_technology_cube)
+def show_technology_distribution(technology_cube, technology_colors):
+    import plotly.express as px
+
+    tech_counts = cube.counts(technology_cube, 'technology').reset_index()
     tech_counts.columns = ['technology', 'count']
 
     top_techs = tech_counts.head(15)
@@ -13,7 +17,7 @@ def show_technology_distribution(all_offers, technology_colors):
         top_techs,
         x='technology',
         y='count',
-        title='Najpopularniejsze technologie w ofertach pracy',
+        title=pipeline.titled('Najpopularniejsze technologie w ofertach pracy', technology_cube['report date']),
         labels={'technology': 'Technologia', 'count': 'Liczba ofert'},
         color='technology',
         color_discrete_map=technology_colors
@@ -32,15 +36,17 @@ def show_technology_distribution(all_offers, technology_colors):
     return fig
 
 
-def show_technology_trends_over_time(all_offers, technology_colors):
-    tech_data = all_offers.explode('technology')
-    top_techs = tech_data['technology'].value_counts().head(6).index.tolist()
-    filtered_data = tech_data[tech_data['technology'].isin(top_techs)]
+def show_technology_trends_over_time(technology_cube, technology_colors):
+    import plotly.express as px
 
-    tech_trends = filtered_data.groupby([
+    top_techs = cube.counts(technology_cube, 'technology').head(6).index.tolist()
+    filtered_cube = technology_cube[technology_cube['technology'].isin(top_techs)]
+
+    tech_trends = cube.rollup(filtered_cube, [
         pd.Grouper(key='report date', freq='ME'),
         'technology'
-    ]).size().reset_index(name='count')
+    ]).reset_index(name='count')
+    tech_trends = pipeline.decategorize(tech_trends)
 
     fig = px.line(
         tech_trends,
@@ -73,9 +79,12 @@ def show_technology_trends_over_time(all_offers, technology_colors):
     return fig
 
 
-def show_popular_technologies_treemap_all_offers(all_offers,
-                                                 title="Najpopularniejsze technologie programistyczne dla miast i pracy zdalnej od września 2023 do czerwca 2024"):
-    tech_by_location = all_offers.groupby(['location', 'technology']).size().reset_index(name="count")
+def show_popular_technologies_treemap_all_offers(technology_cube,
+                                                 title="Najpopularniejsze technologie programistyczne dla miast i pracy zdalnej"):
+    import plotly.express as px
+
+    tech_by_location = cube.rollup(technology_cube, ['location', 'technology']).reset_index(name="count")
+    tech_by_location = pipeline.decategorize(tech_by_location)
 
     fig = px.treemap(
         tech_by_location,
@@ -83,7 +92,7 @@ def show_popular_technologies_treemap_all_offers(all_offers,
         values='count',
         color='count',
         color_continuous_scale=px.colors.sequential.speed,
-        title=title,
+        title=pipeline.titled(title, technology_cube['report date']),
         width=1200
     )
 
@@ -96,6 +105,5 @@ def show_popular_technologies_treemap_all_offers(all_offers,
     return fig
 
 
-def show_popular_technologies_treemap_latest(latest_offers):
-    return show_popular_technologies_treemap_all_offers(latest_offers,
-                                                        title="Najpopularniejsze technologie programistyczne dla miast i pracy zdalnej w dniu 1 czerwca 2024")
+def show_popular_technologies_treemap_latest(latest_technology_cube):
+    return show_popular_technologies_treemap_all_offers(latest_technology_cube)
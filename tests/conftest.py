@@ -0,0 +1,25 @@
+import os
+import shutil
+
+import pytest
+
+from pipeline import pipeline
+
+DATASET_DIR = os.path.join(os.path.dirname(__file__), os.pardir, 'dataset')
+
+
+@pytest.fixture(scope='session')
+def dataset_dir():
+    return DATASET_DIR
+
+
+@pytest.fixture
+def copy_months(dataset_dir):
+    # Pierwsze count miesięcy zbioru w osobnym katalogu - testy dopisują do niego pliki
+    def copy(target_dir, count):
+        os.makedirs(target_dir, exist_ok=True)
+        for path in list(pipeline.find_dataset_files(dataset_dir).values())[:count]:
+            shutil.copy2(path, target_dir)
+        return str(target_dir)
+
+    return copy
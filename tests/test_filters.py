@@ -0,0 +1,44 @@
+import numpy as np
+
+from aggregates import aggregates
+from filters import filters
+from identity import identity
+from pipeline import pipeline
+from postings import postings
+
+SELECTIONS = [
+    (None, None, ('Warszawa',), None, None),
+    (np.datetime64('2024-01-01'), np.datetime64('2024-06-01'), ('Kraków', 'Warszawa'), ('Python',), ('mid', 'senior')),
+    (None, None, None, ('Java', 'Kotlin', 'Nowhere'), None),
+    (None, np.datetime64('2023-12-01'), ('Nowhere',), None, ('junior',)),
+]
+
+
+def masked(frame, selection):
+    # Ten sam wybór zwykłymi maskami po kolumnach
+    mask = np.ones(len(frame), dtype=bool)
+    if selection[0] is not None:
+        mask &= (frame['report date'] >= selection[0]).to_numpy()
+    if selection[1] is not None:
+        mask &= (frame['report date'] <= selection[1]).to_numpy()
+    for dimension, values in zip(filters.FILTER_DIMENSIONS, selection[2:]):
+        if values is None:
+            continue
+        if dimension == 'technology' and 'technologies' in frame:
+            combinations = frame['technologies']
+            values = postings.matching_combinations(combinations.cat.categories, values)
+            mask &= combinations.isin(values).to_numpy()
+        else:
+            mask &= frame[dimension].isin(values).to_numpy()
+    return frame[mask]
+
+
+def test_index_selects_same_rows_as_masks(dataset_dir):
+    all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+    all_offers = identity.mark_previous_seen(
+        all_offers, identity.build_index(all_offers['id hash'], all_offers['report date']))
+    for name, frame in aggregates.build_aggregates(all_offers).items():
+        index = filters.build_index(frame)
+        for selection in SELECTIONS:
+            assert filters.filter_cube(frame, selection, index).index.tolist() == \
+                masked(frame, selection).index.tolist(), name
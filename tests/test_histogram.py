@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from histogram import histogram
+from pipeline import pipeline
+
+
+def per_cell_histogram(values, low, bin_size):
+    # Histogram jednej grupy osobno, jak przed grouped_histograms
+    edges = low + np.arange(np.floor((values.max() - low) / bin_size) + 2) * bin_size
+    counts, _ = np.histogram(values, bins=edges)
+    return np.flatnonzero(counts), counts[counts > 0]
+
+
+def test_grouped_histograms_match_per_cell(dataset_dir):
+    all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+    keys = ['seniority', 'contract type']
+    stats, histograms = histogram.grouped_histograms(all_offers, keys, 'salary b2b mean')
+
+    values_by_group = dict(list(all_offers.dropna(subset=['salary b2b mean']).groupby(keys, observed=True)[
+        'salary b2b mean']))
+    for key, (bins, counts) in zip(stats.index, histograms):
+        cell = stats.loc[key]
+        if key not in values_by_group:
+            # Grupa bez wynagrodzeń B2B (np. same oferty UoP) zostaje w wyniku z zerową licznością
+            assert cell['count'] == 0 and bins.size == 0
+            continue
+        values = values_by_group[key].to_numpy()
+        assert cell['count'] == len(values)
+        assert cell['median'] == np.median(values)
+        assert cell['bin size'] == histogram.nice_bin_size((values.max() - values.min()) / 50)
+        expected_bins, expected_counts = per_cell_histogram(values, cell['low'], cell['bin size'])
+        np.testing.assert_array_equal(bins, expected_bins)
+        np.testing.assert_array_equal(counts, expected_counts)
+        assert cell['max count'] == expected_counts.max()
+    assert set(values_by_group) <= set(stats.index)
+
+def test_grouped_histograms_weights_match_repeated_rows():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'group': rng.integers(0, 4, 500), 'value': rng.normal(15000, 4000, 500).round()})
+    weights = rng.integers(1, 5, 500)
+    repeated = frame.loc[frame.index.repeat(weights)].reset_index(drop=True)
+
+    weighted_stats, weighted = histogram.grouped_histograms(frame, ['group'], 'value', weights=weights)
+    stats, histograms = histogram.grouped_histograms(repeated, ['group'], 'value')
+
+    # Kubełki zależą od rozpiętości wartości, a nie od wag - wynik jak na rozwiniętych wierszach
+    pd.testing.assert_frame_equal(weighted_stats, stats)
+    for (weighted_bins, weighted_counts), (bins, counts) in zip(weighted, histograms):
+        np.testing.assert_array_equal(weighted_bins, bins)
+        np.testing.assert_array_equal(weighted_counts, counts)
+
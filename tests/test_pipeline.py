@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks import dtypes
+from benchmarks import prepare_offers
+from pipeline import pipeline
+
+
+def assert_matches_legacy(raw):
+    prepared = pipeline.prepare_offers(raw)
+    # Jak w benchmarks/prepare_offers.py: skrótu id ani listy technologii pierwotna wersja nie liczyła
+    pd.testing.assert_frame_equal(dtypes.as_objects(prepared.drop(columns=['id hash', 'technologies'])),
+                                  prepare_offers.legacy_prepare_offers(raw), check_dtype=False)
+    return prepared
+
+
+def test_prepare_offers_matches_legacy(dataset_dir):
+    assert_matches_legacy(prepare_offers.load_raw_offers(dataset_dir).reset_index(drop=True))
+
+
+def test_prepare_offers_edge_cases():
+    # Typy kontraktu, brak wielkości firmy, wielkość powyżej 10000 i połówki przy zaokrąglaniu średniej
+    raw = pd.DataFrame({
+        'id': ['a', 'b', 'c', 'd'],
+        'company size': [5.0, 25000.0, np.nan, 100.0],
+        'location': ['Remote', 'Warszawa', 'Kraków', 'Remote'],
+        'technology': ['Java', 'Python', 'Java', 'Go'],
+        'seniority': ['mid', 'senior', 'junior', 'expert'],
+        'salary employment min': [10000.0, np.nan, 8000.0, np.nan],
+        'salary employment max': [12000.0, np.nan, 9001.0, np.nan],
+        'salary b2b min': [15000.0, 20000.0, np.nan, np.nan],
+        'salary b2b max': [17001.0, 22000.0, np.nan, np.nan],
+        'report date': pd.Timestamp('2024-01-01'),
+    })
+    prepared = assert_matches_legacy(raw)
+    # Jak w pierwotnej kolejności warunków: oferta bez żadnych widełek trafia do 'b2b', a nie 'none'
+    assert list(prepared['contract type']) == ['both', 'b2b', 'employment', 'b2b']
+    assert prepared['id hash'].nunique() == len(raw)
+
+
+def test_prepare_offers_primary_technology():
+    raw = pd.DataFrame({
+        'id': ['a', 'b', 'c'],
+        'company size': [10.0, 10.0, 10.0],
+        'location': ['Remote', 'Remote', 'Remote'],
+        'technology': ['Java, Spring', 'Python; Java', 'Java'],
+        'seniority': ['mid', 'mid', 'mid'],
+        'salary employment min': [10000.0, 10000.0, 10000.0],
+        'salary employment max': [12000.0, 12000.0, 12000.0],
+        'salary b2b min': [np.nan, np.nan, np.nan],
+        'salary b2b max': [np.nan, np.nan, np.nan],
+        'report date': pd.Timestamp('2024-01-01'),
+    })
+    prepared = pipeline.prepare_offers(raw)
+    # Pierwsza wymieniona technologia jako wymiar, pełna lista z ogłoszenia obok
+    assert list(prepared['technology']) == ['Java', 'Python', 'Java']
+    assert list(prepared['technologies']) == ['Java, Spring', 'Python; Java', 'Java']
+
+
+def test_read_empty_month(tmp_path):
+    # Plik pusty wczytuje się tak samo jak plik z samym nagłówkiem - miesiąc bez ofert
+    header_only = tmp_path / '202401_soft_eng_jobs_pol.csv'
+    header_only.write_text(','.join(pipeline.OFFER_DTYPES) + '\n')
+    empty = tmp_path / '202402_soft_eng_jobs_pol.csv'
+    empty.write_text('')
+
+    report_date = pd.Timestamp('2024-01-01')
+    pd.testing.assert_frame_equal(pipeline.read_month(empty, report_date),
+                                  pipeline.read_month(header_only, report_date))
+    assert len(pipeline.load_offers(str(tmp_path))) == 0
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from cube import cube
+from pipeline import pipeline
+from sketch import sketch
+
+LEVELS = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+def exact_quantiles(all_offers, column, keys):
+    # Pozycja p*N - 0.5 z interpolacją liniową, jak w sketch.quantiles i w plotly
+    return all_offers.dropna(subset=[column]).groupby(keys, observed=True)[column].apply(
+        lambda values: pd.Series(np.quantile(values.to_numpy(), LEVELS, method='hazen'), index=LEVELS)).unstack()
+
+
+def test_sketch_quantiles_within_relative_accuracy(dataset_dir):
+    all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+    sketches = sketch.build_sketches(all_offers)
+    for salary, column in sketch.SKETCH_SALARIES.items():
+        for keys in (['seniority'], ['report date', 'location'], ['technology', 'seniority']):
+            approximate = sketch.quantiles(sketches[sketches['salary'] == salary], keys, LEVELS)
+            exact = exact_quantiles(all_offers, column, keys)
+            assert approximate.index.tolist() == exact.index.tolist()
+            counts = all_offers.groupby(keys, observed=True)[column].count()
+            np.testing.assert_array_equal(approximate['count'].to_numpy(), counts[counts > 0].to_numpy())
+            error = np.abs(approximate[LEVELS].to_numpy() - exact[LEVELS].to_numpy()) / exact[LEVELS].to_numpy()
+            assert error.max() <= sketch.RELATIVE_ACCURACY + 1e-9
+
+
+def test_sketches_merge_like_whole(dataset_dir):
+    all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+    # Szkice dowolnych porcji wierszy scalone sumowaniem są takie same jak szkice całości
+    parts = [sketch.build_sketches(all_offers.iloc[start:start + 5000]) for start in range(0, len(all_offers), 5000)]
+    merged = cube.merge_cubes(parts, sketch.SKETCH_KEYS)
+    whole = sketch.build_sketches(all_offers)
+    pd.testing.assert_series_equal(merged.set_index(sketch.SKETCH_KEYS)['count'].sort_index(),
+                                   whole.set_index(sketch.SKETCH_KEYS)['count'].sort_index())
+
+
+def test_sketch_size_does_not_grow_with_offers(dataset_dir):
+    all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+    sketches = sketch.build_sketches(all_offers)
+    # Trzy razy te same oferty: te same komórki i kubełki, tylko większe liczności
+    tripled = sketch.build_sketches(pipeline.concat_months([all_offers.copy(deep=False) for _ in range(3)]))
+    assert len(tripled) == len(sketches)
+    assert tripled['count'].sum() == 3 * sketches['count'].sum()
+    assert sketches.groupby(sketch.SKETCH_DIMENSIONS + ['salary'], observed=True, dropna=False).size().max() <= \
+        sketch.MAX_BINS
+
+
+def test_narrow_sketches(dataset_dir):
+    all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+    sizes = sketch.build_company_size_sketches(all_offers)
+    for salary in sketch.SKETCH_SALARIES:
+        only = all_offers[all_offers['contract type'] == salary]
+        assert sizes.loc[sizes['salary'] == salary, 'count'].sum() == only[sketch.SKETCH_SALARIES[salary]].count()
+
+    ranges = sketch.build_range_sketches(all_offers)
+    assert ranges['count'].sum() == all_offers['salary employment mean'].count()
+    assert ranges['spread'].between(sketch.MIN_SPREAD, sketch.MAX_SPREAD).all()
@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+
+from pipeline import pipeline
+from snapshot import snapshot
+
+
+def test_snapshot_round_trip(copy_months, tmp_path):
+    all_offers = pipeline.prepare_offers(pipeline.load_offers(copy_months(tmp_path / 'dataset', 2)))
+    path = str(tmp_path / f'offers.{snapshot.SNAPSHOT_FORMAT}')
+    snapshot.write_snapshot(all_offers, path)
+    # Kolumny kategoryczne (razem z kolejnością kategorii) i typy liczbowe zachowane bez zmian
+    pd.testing.assert_frame_equal(snapshot.read_snapshot(path), all_offers)
+
+
+def test_load_prepared_offers_reuses_snapshot(copy_months, tmp_path):
+    dataset = copy_months(tmp_path / 'dataset', 2)
+    cache_dir = str(tmp_path / 'cache')
+
+    prepared, _ = snapshot.load_prepared_offers(dataset, cache_dir)
+    path = snapshot.snapshot_path(snapshot.dataset_key(pipeline.find_dataset_files(dataset)), cache_dir)
+    assert os.listdir(cache_dir) == [os.path.basename(path)]
+
+    cached, latest = snapshot.load_prepared_offers(dataset, cache_dir)
+    pd.testing.assert_frame_equal(cached, prepared)
+    pd.testing.assert_frame_equal(latest, pipeline.latest_offers(prepared))
+
+
+def test_new_month_replaces_snapshot(copy_months, tmp_path):
+    dataset = copy_months(tmp_path / 'dataset', 2)
+    cache_dir = str(tmp_path / 'cache')
+    snapshot.load_prepared_offers(dataset, cache_dir)
+    old_key = snapshot.dataset_key(pipeline.find_dataset_files(dataset))
+
+    copy_months(dataset, 3)
+    all_offers, _ = snapshot.load_prepared_offers(dataset, cache_dir)
+    new_key = snapshot.dataset_key(pipeline.find_dataset_files(dataset))
+
+    # Nowy plik zmienia klucz zbioru - snapshot budowany od nowa, a poprzedni usuwany
+    assert new_key != old_key
+    assert os.listdir(cache_dir) == [os.path.basename(snapshot.snapshot_path(new_key, cache_dir))]
+    assert all_offers['report date'].nunique() == 3
+
+
+def test_store_keeps_snapshot_written_by_another_process(copy_months, tmp_path):
+    dataset = copy_months(tmp_path / 'dataset', 2)
+    cache_dir = str(tmp_path / 'cache')
+    all_offers, _ = snapshot.load_prepared_offers(dataset, cache_dir)
+    files = pipeline.find_dataset_files(dataset)
+    path = snapshot.snapshot_path(snapshot.dataset_key(files), cache_dir)
+    written = os.stat(path).st_mtime_ns
+
+    # Drugi worker po tym samym nowym miesiącu nie nadpisuje gotowego pliku
+    snapshot.store_prepared_offers(all_offers, files, cache_dir)
+    assert os.stat(path).st_mtime_ns == written
+
+
+def test_stale_snapshots_keep_files_being_written(tmp_path):
+    cache_dir = str(tmp_path)
+    current = snapshot.snapshot_path('current', cache_dir)
+    stale = snapshot.snapshot_path('stale', cache_dir)
+    # Zapis w toku w innym procesie (write_snapshot)
+    in_flight = f"{snapshot.snapshot_path('other', cache_dir)}.12345.tmp"
+    for path in (current, stale, in_flight):
+        open(path, 'w').close()
+
+    snapshot.remove_stale_snapshots(current, cache_dir)
+    assert sorted(os.listdir(cache_dir)) == sorted(os.path.basename(path) for path in (current, in_flight))
@@ -0,0 +1,55 @@
+import pandas as pd
+
+from aggregates import aggregates
+from identity import identity
+from pipeline import pipeline
+from stream import stream
+
+
+def eager_aggregates(dataset_dir):
+    all_offers = pipeline.prepare_offers(pipeline.load_offers(dataset_dir))
+    offer_index = identity.build_index(all_offers['id hash'], all_offers['report date'])
+    return aggregates.build_aggregates(identity.mark_previous_seen(all_offers, offer_index)), offer_index
+
+
+def totals(frame, keys):
+    return frame.groupby(keys, observed=True, dropna=False)['count'].sum().sort_index()
+
+
+def test_streamed_aggregates_match_eager(copy_months, tmp_path):
+    dataset = copy_months(tmp_path / 'dataset', 4)
+    expected, expected_index = eager_aggregates(dataset)
+    # Porcje dużo mniejsze od miesiąca - komórki tej samej porcji i miesiąca muszą się scalić
+    streamed, offer_index = stream.aggregate_offers(dataset, chunksize=700)
+
+    for name, keys in aggregates.DIMENSIONS.items():
+        pd.testing.assert_series_equal(totals(streamed[name], keys), totals(expected[name], keys))
+    pd.testing.assert_frame_equal(identity.churn(offer_index), identity.churn(expected_index))
+
+
+def test_ingested_month_matches_full_load(copy_months, tmp_path):
+    dataset = copy_months(tmp_path / 'dataset', 3)
+    files = pipeline.find_dataset_files(dataset)
+    last = max(files)
+
+    earlier, offer_index = stream.aggregate_months({date: path for date, path in files.items() if date != last},
+                                                   stream.empty_index(), chunksize=1000)
+    new_months, offer_index = stream.ingest_months({last: files[last]}, offer_index, chunksize=1000)
+    expected, _ = stream.aggregate_offers(dataset, chunksize=1000)
+
+    ingested = aggregates.concat_aggregates([earlier, new_months])
+    for name, keys in aggregates.DIMENSIONS.items():
+        pd.testing.assert_series_equal(totals(ingested[name], keys), totals(expected[name], keys))
+
+
+def test_empty_month(tmp_path):
+    # Plik z samym nagłówkiem i plik pusty to miesiąc bez ofert, a nie błąd wczytywania
+    header_only = tmp_path / '202401_soft_eng_jobs_pol.csv'
+    header_only.write_text(','.join(stream.STREAM_COLUMNS) + '\n')
+    (tmp_path / '202402_soft_eng_jobs_pol.csv').write_text('')
+
+    streamed, offer_index = stream.aggregate_offers(str(tmp_path))
+    assert aggregates.cells(streamed) == 0
+    for name, keys in aggregates.DIMENSIONS.items():
+        assert list(streamed[name].columns[:len(keys) + 1]) == keys + ['count']
+    assert identity.unique_offers(offer_index) == 0
@@ -0,0 +1,17 @@
+from pipeline import pipeline
+from watcher import watcher
+
+
+def test_header_only_file_is_ingested_once(copy_months, tmp_path):
+    dataset = copy_months(tmp_path / 'dataset', 2)
+    ingested = watcher.loaded_files(pipeline.prepare_offers(pipeline.load_offers(dataset)), dataset)
+    assert watcher.find_new_files(ingested, dataset) == {}
+
+    # Plik z samym nagłówkiem nie dodaje do danych żadnego miesiąca - rozpoznawany po ścieżce
+    header_only = tmp_path / 'dataset' / '209901_soft_eng_jobs_pol.csv'
+    header_only.write_text(','.join(pipeline.OFFER_DTYPES) + '\n')
+    new_files = watcher.find_new_files(ingested, dataset)
+    assert list(new_files.values()) == [str(header_only)]
+
+    ingested[str(header_only)] = watcher.file_signature(str(header_only))
+    assert watcher.find_new_files(ingested, dataset) == {}
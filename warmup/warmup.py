@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.histogram('dashboard_warmup_seconds', "Czas etapów rozgrzewania przy starcie (dane, wykresy)")
+
+
+class Progress:
+    def __init__(self):
+        self.stage = 'pending'
+        self.done = 0
+        self.total = 0
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._stage_started = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def begin(self, stage, total=0):
+        now = time.perf_counter()
+        with self._lock:
+            self._observe_stage(now)
+            self.stage = stage
+            self.done = 0
+            self.total = total
+            self.started = self.started or now
+            self._stage_started = now
+
+    def advance(self):
+        with self._lock:
+            self.done += 1
+
+    def finish(self):
+        now = time.perf_counter()
+        with self._lock:
+            self._observe_stage(now)
+            self.stage = 'ready'
+            self.finished = now
+        self._ready.set()
+
+    def fail(self, error):
+        with self._lock:
+            self.stage = 'failed'
+            self.error = str(error)
+
+    def _observe_stage(self, now):
+        if self._stage_started is not None:
+            metrics.observe('dashboard_warmup_seconds', now - self._stage_started, stage=self.stage)
+            self._stage_started = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def stats(self):
+        with self._lock:
+            end = self.finished or time.perf_counter()
+            return {
+                'ready': self.ready,
+                'stage': self.stage,
+                'done': self.done,
+                'total': self.total,
+                'elapsed': round(end - self.started, 3) if self.started is not None else 0.0,
+                'error': self.error,
+            }
+
+
+def run_in_background(progress, function, name='warmup'):
+    def run():
+        try:
+            function()
+        except Exception as error:
+            progress.fail(error)
+            logger.exception("Błąd podczas rozgrzewania aplikacji")
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,80 @@
+import logging
+import os
+import threading
+import time
+
+from metrics import metrics
+from pipeline import pipeline
+from snapshot import snapshot
+
+POLL_INTERVAL = 60
+
+logger = logging.getLogger(__name__)
+
+
+def loaded_files(all_offers, dataset_dir='dataset'):
+    # Pliki wczytane przed startem watchera - ich miesiące są już w danych
+    known = set(all_offers['report date'].unique())
+    return {path: file_signature(path) for report_date, path in pipeline.find_dataset_files(dataset_dir).items()
+            if report_date in known}
+
+
+def find_new_files(ingested, dataset_dir='dataset'):
+    # Po ścieżce, a nie po miesiącach w danych - plik z samym nagłówkiem nie dodaje żadnego miesiąca,
+    # a nie może być wczytywany od nowa przy każdym sprawdzeniu
+    return {report_date: path for report_date, path in pipeline.find_dataset_files(dataset_dir).items()
+            if path not in ingested}
+
+
+def ingest_months(all_offers, new_files):
+    # Wczytujemy i przygotowujemy tylko nowe miesiące, historia nie jest przeliczana od nowa
+    dfs = [pipeline.read_month(path, report_date) for report_date, path in sorted(new_files.items())]
+    new_offers = pipeline.prepare_offers(pipeline.concat_months(dfs))
+    return pipeline.append_offers(all_offers, new_offers)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def watch_dataset(get_offers, on_update, dataset_dir='dataset', interval=POLL_INTERVAL, ingest=ingest_months,
+                  store=snapshot.store_prepared_offers):
+    # Polling zamiast inotify - nowy plik pojawia się raz w miesiącu, a nie potrzebujemy dodatkowych zależności
+    # Wczytane pliki: ścieżka -> (rozmiar, mtime) z chwili wczytania
+    ingested = loaded_files(get_offers(), dataset_dir)
+    pending = {}
+
+    def poll():
+        nonlocal pending
+        new_files = find_new_files(ingested, dataset_dir)
+
+        # Plik jest wczytywany dopiero, gdy jego rozmiar i mtime nie zmieniły się od poprzedniego sprawdzenia
+        signatures = {path: file_signature(path) for path in new_files.values()}
+        ready = {report_date: path for report_date, path in new_files.items()
+                 if pending.get(path) == signatures[path]}
+        pending = signatures
+        if not ready:
+            return
+
+        with metrics.timer('dashboard_dataset_load_seconds', source='new months'):
+            all_offers = ingest(get_offers(), ready)
+        ingested.update((path, signatures[path]) for path in ready.values())
+        on_update(all_offers, sorted(ready))
+        if store is None:
+            return
+
+        store(all_offers, {report_date: path for report_date, path in pipeline.find_dataset_files(dataset_dir).items()
+                           if path in ingested})
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                poll()
+            except Exception:
+                logger.exception("Błąd podczas wczytywania nowych plików z %s", dataset_dir)
+
+    thread = threading.Thread(target=run, name="dataset-watcher", daemon=True)
+    thread.start()
+    return thread
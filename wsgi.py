@@ -0,0 +1,26 @@
+import gc
+import logging
+import os
+
+import main
+
+server = main.app.server
+
+# Komunikaty aplikacji (nowe miesiące, błędy watchera i rozgrzewania) na stderr, jak logi gunicorna
+logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(process)d] [%(levelname)s] %(name)s: %(message)s')
+
+# Domyślnie proces nadrzędny przed fork tylko wczytuje dane - workery współdzielą je copy-on-write
+# i obsługują żądania od razu, a wykresy rozgrzewają w tle (post_fork w gunicorn.conf.py albo pierwsze
+# żądanie); /ready zwraca 200 po rozgrzaniu.
+# WARMUP_BEFORE_FORK=1: przed fork także wykresy - każdy worker ma od pierwszego żądania gotowy cache,
+# ale gunicorn zaczyna obsługiwać żądania dopiero po zbudowaniu wszystkich wykresów.
+# WARMUP_PER_WORKER=1: najszybszy start procesu nadrzędnego - każdy worker wczytuje dane i rozgrzewa wykresy
+# sam w tle, kosztem osobnej kopii danych w każdym workerze.
+if os.environ.get('WARMUP_BEFORE_FORK') == '1':
+    main.warm_up()
+elif os.environ.get('WARMUP_PER_WORKER') != '1':
+    main.ensure_data()
+
+# Zamrożenie GC sprawia, że przebiegi GC w workerach nie dotykają obiektów z procesu nadrzędnego
+# i nie kopiują ich stron pamięci.
+gc.freeze()